@@ -2,11 +2,11 @@
 Dependencias para la API FastAPI.
 Centraliza las funciones que se usan como dependencias en los endpoints.
 """
+import hmac
 import logging
-from fastapi import HTTPException, Depends, status
-from fastapi.security import APIKeyHeader
+from typing import Optional
+from fastapi import HTTPException, status
 
-from email_system.core.exceptions import AuthenticationError
 from email_system.email_service.service import EmailService
 from email_system.core.config import settings
 from email_system.core.models import EmailAddress
@@ -16,35 +16,66 @@ logger = logging.getLogger(__name__)
 
 # Configuración de seguridad
 API_KEY_NAME = "X-API-Key"
-api_key_header = APIKeyHeader(name=API_KEY_NAME)
 
 
-async def get_api_key(api_key: str = Depends(api_key_header)):
+def is_valid_api_key(api_key: Optional[str]) -> bool:
     """
     Verifica que la API key sea válida.
     
+    La comparación se hace en tiempo constante para no filtrar información
+    sobre la clave por diferencias de tiempo.
+    
     Args:
         api_key: API key proporcionada en el header
         
     Returns:
-        str: API key si es válida
+        bool: True si la API key es válida
+    """
+    if not api_key:
+        return False
+    return hmac.compare_digest(api_key.encode(), settings.API_KEY.encode())
+
+
+# Instancia compartida del servicio de email (se crea en la primera petición)
+_email_service: Optional[EmailService] = None
+
+
+def _build_email_service() -> EmailService:
+    """
+    Construye el servicio de email a partir de la configuración.
+    
+    Returns:
+        EmailService: Instancia compartida del servicio de email
         
     Raises:
-        HTTPException: Si la API key es inválida
+        ValueError: Si falta la configuración requerida
+        EmailServiceError: Si hay un error al configurar el servicio
     """
-    if api_key != settings.API_KEY:
-        logger.warning(f"Intento de acceso con API key inválida")
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="API key inválida",
-            headers={"WWW-Authenticate": "APIKey"},
-        )
-    return api_key
+    # Obtener la API key de la configuración
+    api_key = settings.RESEND_API_KEY
+    if not api_key:
+        raise ValueError("RESEND_API_KEY no configurada")
+    
+    # Crear la dirección de email predeterminada
+    default_from_data = settings.get_default_from_address()
+    default_from = EmailAddress(**default_from_data)
+    
+    # Crear y retornar el servicio
+    return EmailService(
+        api_key=api_key,
+        default_from=default_from,
+        templates_dir=settings.get_templates_dir(),
+        testing=settings.TESTING
+    )
 
 
 def get_email_service() -> EmailService:
     """
-    Retorna una instancia configurada del servicio de email.
+    Retorna la instancia compartida del servicio de email.
+    
+    El servicio (y su entorno de plantillas) se construye en la primera
+    petición y se reutiliza en las siguientes. Si la construcción falla
+    no se cachea el error, por lo que se reintenta en la próxima petición.
     
     Returns:
         EmailService: Instancia del servicio de email
@@ -52,26 +83,42 @@ def get_email_service() -> EmailService:
     Raises:
         HTTPException: Si hay un error al crear el servicio
     """
+    global _email_service
+    if _email_service is not None:
+        return _email_service
+    
     try:
-        # Obtener la API key de la configuración
-        api_key = settings.RESEND_API_KEY
-        if not api_key:
-            raise ValueError("RESEND_API_KEY no configurada")
-        
-        # Crear la dirección de email predeterminada
-        default_from_data = settings.get_default_from_address()
-        default_from = EmailAddress(**default_from_data)
-        
-        # Crear y retornar el servicio
-        return EmailService(
-            api_key=api_key,
-            default_from=default_from,
-            templates_dir=settings.get_templates_dir(),
-            testing=settings.TESTING
-        )
+        _email_service = _build_email_service()
     except Exception as e:
-        logger.error(f"Error al crear el servicio de email: {str(e)}")
+        logger.error("Error al crear el servicio de email: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error al configurar el servicio de email: {str(e)}"
-        )
\ No newline at end of file
+        )
+    return _email_service
+
+
+def set_email_service(service: Optional[EmailService]) -> None:
+    """
+    Reemplaza la instancia compartida del servicio de email.
+    
+    Permite inyectar un servicio alternativo (por ejemplo en pruebas); con
+    None, el servicio se vuelve a construir en la próxima petición.
+    
+    Args:
+        service: Servicio a usar o None
+    """
+    global _email_service
+    _email_service = service
+
+
+async def close_email_service() -> None:
+    """
+    Libera los recursos del servicio de email compartido, si llegó a crearse.
+    
+    Se invoca al apagar la aplicación para cerrar el cliente HTTP asíncrono.
+    """
+    global _email_service
+    if _email_service is not None:
+        await _email_service.aclose()
+        _email_service = None
\ No newline at end of file
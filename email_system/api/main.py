@@ -1,23 +1,53 @@
 """
 Aplicación FastAPI principal para el sistema de emails.
 """
+import atexit
 import logging
-from fastapi import FastAPI, Request, status
-from fastapi.responses import JSONResponse
+import queue
+import sys
+from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener
+from typing import AsyncIterator
+import orjson
+from fastapi import FastAPI, Request, Response, status
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
 import uvicorn
 
+from email_system.api.dependencies import API_KEY_NAME, close_email_service, is_valid_api_key
 from email_system.api.routes.email_routes import router as email_router
 from email_system.core.exceptions import EmailSystemError, APIError
 from email_system.core.config import settings
 
-# Configurar logging
-logging.basicConfig(
-    level=logging.INFO if not settings.DEBUG else logging.DEBUG,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+# Configurar logging: los handlers solo encolan los registros y un hilo en
+# segundo plano los escribe, para no bloquear el event loop con E/S
+_log_queue = queue.SimpleQueue()
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(
+    logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 )
+_log_listener = QueueListener(_log_queue, _log_handler, respect_handler_level=True)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+# El QueueHandler no formatea: solo el handler del listener lo hace, una vez
+_root_logger = logging.getLogger()
+_root_logger.setLevel(logging.INFO if not settings.DEBUG else logging.DEBUG)
+_root_logger.addHandler(QueueHandler(_log_queue))
 logger = logging.getLogger(__name__)
 
+
+# Cierre ordenado de recursos compartidos
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Cierra el cliente HTTP del servicio de email al apagar la aplicación."""
+    yield
+    await close_email_service()
+
+
 # Crear la aplicación FastAPI
 app = FastAPI(
     title="Email System API",
@@ -25,17 +55,58 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
+class APIKeyMiddleware:
+    """
+    Middleware ASGI que rechaza las peticiones a /api sin una API key válida.
+    
+    La clave se comprueba antes de leer el cuerpo de la petición. Al ser un
+    middleware ASGI puro no envuelve la respuesta en un stream, así que
+    GZipMiddleware sigue viendo el tamaño del cuerpo y las peticiones válidas
+    no pagan tareas ni colas adicionales.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] == "http"
+            and scope["path"].startswith("/api")
+            and scope["method"] != "OPTIONS"
+            and not is_valid_api_key(Headers(scope=scope).get(API_KEY_NAME))
+        ):
+            logger.warning("Intento de acceso con API key inválida")
+            response = ORJSONResponse(
+                status_code=status.HTTP_403_FORBIDDEN,
+                content={"detail": "API key inválida"},
+                headers={"WWW-Authenticate": "APIKey"},
+            )
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+
+# Se registra antes que CORS para que CORS quede como middleware externo
+# y las respuestas de rechazo también lleven sus cabeceras.
+app.add_middleware(APIKeyMiddleware)
+
 # Configurar middleware CORS
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Configurar según el entorno
+    allow_origins=settings.CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=[API_KEY_NAME, "Content-Type", "Content-Encoding"],
 )
 
+# Comprimir las respuestas grandes; los cuerpos de petición con gzip se
+# descomprimen en ORJSONRequest
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Incluir routers
 app.include_router(email_router, prefix="/api")
 
@@ -49,25 +120,39 @@ async def email_system_exception_handler(request: Request, exc: EmailSystemError
     if isinstance(exc, APIError):
         status_code = exc.status_code
     
-    logger.error(f"Error: {exc.message}")
-    return JSONResponse(
+    logger.error("Error: %s", exc.message)
+    return ORJSONResponse(
         status_code=status_code,
         content={"detail": exc.message},
     )
 
 
-# Endpoint de estado
-@app.get("/health", tags=["health"])
+# Endpoint de estado. El cuerpo es constante, así que se serializa una sola
+# vez al importar el módulo; la Response se crea en cada consulta porque los
+# middlewares (GZip) modifican sus cabeceras
+_HEALTH_BODY = orjson.dumps({"status": "ok", "version": app.version})
+
+
+@app.get("/health", tags=["health"], response_class=Response)
 async def health_check():
     """Retorna el estado de la API."""
-    return {"status": "ok", "version": "1.0.0"}
+    return Response(_HEALTH_BODY, media_type="application/json")
 
 
-if __name__ == "__main__":
-    # Iniciar el servidor usando uvicorn
+def main():
+    """Inicia el servidor usando uvicorn."""
+    # uvloop no está disponible en Windows
+    loop = "asyncio" if sys.platform == "win32" else "uvloop"
     uvicorn.run(
         "email_system.api.main:app",
         host="0.0.0.0",
         port=8000,
         reload=settings.DEBUG,
-    )
\ No newline at end of file
+        loop=loop,
+        http="httptools",
+        workers=None if settings.DEBUG else settings.WORKERS,
+    )
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
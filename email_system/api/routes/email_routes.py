@@ -2,34 +2,30 @@
 Rutas de API para el sistema de emails organizadas por funcionalidad.
 """
 import logging
-from typing import List, Dict, Any, Union, Optional
-from fastapi import APIRouter, HTTPException, Depends, status
-from fastapi.responses import JSONResponse
+from itertools import chain, repeat
+from typing import List, Union, Optional, Literal, Tuple
+from typing_extensions import Annotated
+from fastapi import APIRouter, HTTPException, status
 
-from email_system.api.dependencies import get_api_key, get_email_service
+from email_system.api.dependencies import get_email_service
+from email_system.api.routing import ORJSONRoute
 from email_system.core.models import Company, EmailAddress, Notification, Alert
-from email_system.email_service.service import EmailService
+from email_system.email_service.types.base import BaseEmail
 from email_system.email_service.types.templates import (
     WelcomeEmail, PasswordResetEmail, NotificationEmail, AlertEmail
 )
 from email_system.core.exceptions import EmailServiceError, TemplateNotFoundError
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field, RootModel
 
 # Configurar logger
 logger = logging.getLogger(__name__)
 
 # Crear router
-router = APIRouter(prefix="/emails", tags=["emails"])
+router = APIRouter(prefix="/emails", tags=["emails"], route_class=ORJSONRoute)
 
 # Modelos Pydantic para la API
-class CompanyBase(BaseModel):
-    name: str
-    address: str
-    support_email: str
-    website: str
-    social_media: Dict[str, str] = {}
-    logo_url: Optional[str] = None
-
+# Company, Notification y Alert se usan directamente como modelos de entrada:
+# se validan una sola vez al parsear la petición y se pasan tal cual al dominio.
 class EmailAddressBase(BaseModel):
     email: EmailStr
     name: Optional[str] = None
@@ -40,36 +36,91 @@ class MultiEmailAddressBase(BaseModel):
     
     def to_email_addresses(self) -> List[EmailAddress]:
         """Convierte el modelo a una lista de objetos EmailAddress"""
-        result = []
-        for i, email in enumerate(self.emails):
-            name = None
-            if self.names and i < len(self.names):
-                name = self.names[i]
-            result.append(EmailAddress(email=email, name=name))
-        return result
-
-class NotificationBase(BaseModel):
-    title: str
-    message: str
-    type: str
-    icon: Optional[str] = None
-    action_url: Optional[str] = None
-    action_text: Optional[str] = None
-    additional_info: Optional[str] = None
-
-class AlertBase(BaseModel):
-    title: str
-    message: str
-    type: str = "info"
-    steps: Optional[List[str]] = None
-    action_url: Optional[str] = None
-    action_text: Optional[str] = None
-    contact_support: bool = True
+        # Los emails ya fueron validados como EmailStr; los que no tienen
+        # nombre correspondiente reciben None
+        names = chain(self.names or (), repeat(None))
+        return [
+            EmailAddress.model_construct(email=email, name=name)
+            for email, name in zip(self.emails, names)
+        ]
+
+# Datos propios de cada tipo de email. Las URLs se mantienen como str para
+# no normalizarlas (HttpUrl, por ejemplo, añade una barra final)
+class WelcomeQuery(BaseModel):
+    dashboard_url: str
+
+class PasswordResetQuery(BaseModel):
+    reset_url: str
+    expires_in: int = 24
+
+class NotificationQuery(BaseModel):
+    preferences_url: str = ""
+
+class BatchNotificationQuery(Notification):
+    preferences_url: str = ""
+
+# Modelos para el envío en lote, discriminados por email_type
+class BatchRequestBase(BaseModel):
+    company: Company
+    recipients: List[EmailAddressBase] = Field(..., min_length=1)
+    
+    @property
+    def payload(self) -> BaseModel:
+        """Datos propios del tipo de email, tal como los recibe su constructor."""
+        return self.query
+
+class WelcomeBatchRequest(BatchRequestBase):
+    email_type: Literal["welcome"]
+    query: WelcomeQuery
+
+class PasswordResetBatchRequest(BatchRequestBase):
+    email_type: Literal["password-reset"]
+    query: PasswordResetQuery
+
+class NotificationBatchRequest(BatchRequestBase):
+    email_type: Literal["notification"]
+    query: BatchNotificationQuery
+
+class AlertBatchRequest(BatchRequestBase):
+    email_type: Literal["alert"]
+    alert: Alert
+    
+    @property
+    def payload(self) -> BaseModel:
+        return self.alert
+
+class BatchEmailRequest(RootModel):
+    root: Annotated[
+        Union[
+            WelcomeBatchRequest,
+            PasswordResetBatchRequest,
+            NotificationBatchRequest,
+            AlertBatchRequest,
+        ],
+        Field(discriminator="email_type"),
+    ]
+
+def _resolve_recipients(
+    user: Union[EmailAddressBase, MultiEmailAddressBase]
+) -> Tuple[List[EmailAddress], EmailAddress]:
+    """
+    Convierte el destinatario de la petición en la lista de direcciones de envío.
+    
+    Returns:
+        Tuple[List[EmailAddress], EmailAddress]: Destinatarios y el primero de
+        ellos, que se usa para personalizar la plantilla
+    """
+    if type(user) is MultiEmailAddressBase:
+        recipients = user.to_email_addresses()
+    else:
+        # El email ya fue validado al parsear la petición
+        recipients = [EmailAddress.model_construct(email=user.email, name=user.name)]
+    return recipients, recipients[0]
 
 # Función para manejar errores comunes del servicio de email
 def handle_email_service_error(e: Exception) -> None:
     """Maneja errores comunes del servicio de email y lanza HTTPException apropiada."""
-    logger.error(f"Error en el servicio de email: {str(e)}")
+    logger.error("Error en el servicio de email: %s", e)
     
     if isinstance(e, TemplateNotFoundError):
         raise HTTPException(
@@ -88,328 +139,243 @@ def handle_email_service_error(e: Exception) -> None:
         )
 
 
+# Constructores de emails indexados por email_type. Reciben la empresa, el
+# usuario usado para la plantilla y los datos propios de cada tipo de email.
+def _build_welcome(
+    company: Company, user: EmailAddress, query: WelcomeQuery
+) -> Tuple[BaseEmail, str]:
+    email_obj = WelcomeEmail(
+        company=company,
+        user=user,
+        dashboard_url=query.dashboard_url
+    )
+    return email_obj, f"¡Bienvenido a {company.name}!"
+
+
+def _build_password_reset(
+    company: Company, user: EmailAddress, query: PasswordResetQuery
+) -> Tuple[BaseEmail, str]:
+    email_obj = PasswordResetEmail(
+        company=company,
+        user=user,
+        reset_url=query.reset_url,
+        expires_in=query.expires_in
+    )
+    return email_obj, "Restablecimiento de contraseña"
+
+
+def _build_notification(
+    company: Company, user: EmailAddress, query: BatchNotificationQuery
+) -> Tuple[BaseEmail, str]:
+    # La consulta ya fue validada como Notification; no volver a validarla
+    notification_obj = Notification.model_construct(
+        **query.model_dump(exclude={"preferences_url"})
+    )
+    email_obj = NotificationEmail(
+        company=company,
+        user=user,
+        notification=notification_obj,
+        preferences_url=query.preferences_url
+    )
+    return email_obj, notification_obj.title
+
+
+def _build_alert(
+    company: Company, user: EmailAddress, alert: Alert
+) -> Tuple[BaseEmail, str]:
+    email_obj = AlertEmail(
+        company=company,
+        user=user,
+        alert=alert
+    )
+    return email_obj, alert.title
+
+
+_BUILDERS = {
+    "welcome": _build_welcome,
+    "password-reset": _build_password_reset,
+    "notification": _build_notification,
+    "alert": _build_alert,
+}
+
+
 @router.post("/batch", status_code=status.HTTP_200_OK)
 async def send_batch_emails(
-    request_data: Dict[str, Any],
-    email_service: EmailService = Depends(get_email_service),
-    api_key: str = Depends(get_api_key)
+    request_data: BatchEmailRequest
 ):
     """
     Envía emails personalizados a múltiples destinatarios en un solo llamado.
     """
+    email_service = get_email_service()
+    
+    batch = request_data.root
+    
     try:
-        # Extraer datos del cuerpo
-        email_type = request_data.get("email_type")
-        company_data = request_data.get("company")
-        recipients_data = request_data.get("recipients", [])
-        query_data = request_data.get("query", {})
-        alert_data = request_data.get("alert")
-        
-        # Validar datos
-        if not email_type:
-            raise HTTPException(status_code=400, detail="email_type es requerido")
-        if not company_data:
-            raise HTTPException(status_code=400, detail="company es requerido")
-        if not recipients_data:
-            raise HTTPException(status_code=400, detail="recipients es requerido")
-        
-        # Convertir datos de diccionario a objetos
-        company = Company(
-            name=company_data.get("name", ""),
-            address=company_data.get("address", ""),
-            support_email=EmailAddress(
-                email=company_data.get("support_email", ""),
-                name=company_data.get("name", "")
-            ),
-            website=company_data.get("website", ""),
-            social_media=company_data.get("social_media", {}),
-            logo_url=company_data.get("logo_url")
-        )
+        # Convertir los modelos de la API a objetos del dominio
+        # En lote, el email de soporte se muestra con el nombre de la empresa
+        company = batch.company.model_copy(update={
+            "support_email": EmailAddress.model_construct(
+                email=batch.company.support_email.email,
+                name=batch.company.name
+            )
+        })
         
-        # Validar que haya destinatarios
-        if not recipients_data:
-            raise HTTPException(status_code=400, detail="No se proporcionaron destinatarios")
+        # Los destinatarios ya fueron validados al parsear la petición
+        recipients = [
+            EmailAddress.model_construct(email=recipient.email, name=recipient.name)
+            for recipient in batch.recipients
+        ]
         
-        # Obtener el primer destinatario como referencia para la plantilla
-        first_recipient = recipients_data[0]
-        primary_user = EmailAddress(
-            email=first_recipient.get("email", ""),
-            name=first_recipient.get("name")
-        )
+        # Usar el primer destinatario como referencia para la plantilla
+        primary_user = recipients[0]
         
         # Crear la instancia de email según el tipo
-        if email_type == "welcome":
-            if not query_data or 'dashboard_url' not in query_data:
-                raise HTTPException(status_code=400, detail="dashboard_url es requerido")
-                
-            email_obj = WelcomeEmail(
-                company=company,
-                user=primary_user,
-                dashboard_url=query_data.get("dashboard_url")
-            )
-            subject = f"¡Bienvenido a {company.name}!"
-            
-        elif email_type == "password-reset":
-            if not query_data or 'reset_url' not in query_data:
-                raise HTTPException(status_code=400, detail="reset_url es requerido")
-                
-            email_obj = PasswordResetEmail(
-                company=company,
-                user=primary_user,
-                reset_url=query_data.get("reset_url"),
-                expires_in=query_data.get("expires_in", 24)
-            )
-            subject = "Restablecimiento de contraseña"
-            
-        elif email_type == "notification":
-            if not query_data:
-                raise HTTPException(status_code=400, detail="Se requieren datos para la notificación")
-                
-            notification_obj = Notification(
-                title=query_data.get("title", ""),
-                message=query_data.get("message", ""),
-                type=query_data.get("type", "info"),
-                icon=query_data.get("icon"),
-                action_url=query_data.get("action_url"),
-                action_text=query_data.get("action_text"),
-                additional_info=query_data.get("additional_info")
-            )
-            
-            email_obj = NotificationEmail(
-                company=company,
-                user=primary_user,
-                notification=notification_obj,
-                preferences_url=query_data.get("preferences_url", "")
-            )
-            subject = notification_obj.title
-            
-        elif email_type == "alert":
-            if not alert_data:
-                raise HTTPException(status_code=400, detail="Se requieren datos para la alerta")
-                
-            alert_obj = Alert(
-                title=alert_data.get("title", ""),
-                message=alert_data.get("message", ""),
-                type=alert_data.get("type", "info"),
-                steps=alert_data.get("steps"),
-                action_url=alert_data.get("action_url"),
-                action_text=alert_data.get("action_text"),
-                contact_support=alert_data.get("contact_support", True)
-            )
-            
-            email_obj = AlertEmail(
-                company=company,
-                user=primary_user,
-                alert=alert_obj
-            )
-            subject = alert_data.get("title", "Alerta")
-            
-        else:
-            raise HTTPException(status_code=400, detail=f"Tipo de email no válido: {email_type}")
+        email_obj, subject = _BUILDERS[batch.email_type](company, primary_user, batch.payload)
         
-        # Enviar los emails personalizados en lote
-        results = email_service.send_batch(
+        # Enviar los emails personalizados en lote, contando los resultados
+        # a medida que llegan en lugar de acumularlos
+        success_count = 0
+        total = 0
+        async for result in email_service.send_batch_iter(
             email=email_obj,
-            recipients=recipients_data,
+            recipients=recipients,
             subject=subject
-        )
-        
-        # Contar éxitos y errores
-        success_count = sum(1 for r in results if isinstance(r, dict) and "id" in r)
-        error_count = len(results) - success_count
+        ):
+            total += 1
+            if "id" in result:
+                success_count += 1
         
         return {
             "status": "success", 
             "sent": success_count,
-            "failed": error_count,
-            "total": len(results)
+            "failed": total - success_count,
+            "total": total
         }
         
     except (EmailServiceError, TemplateNotFoundError) as e:
         handle_email_service_error(e)
     except Exception as e:
-        logger.error(f"Error inesperado al enviar emails en lote: {str(e)}")
+        logger.error("Error inesperado al enviar emails en lote: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/welcome", status_code=status.HTTP_200_OK)
 async def send_welcome_email(
-    company: CompanyBase,
+    company: Company,
     user: Union[EmailAddressBase, MultiEmailAddressBase],
-    query: Dict[str, Any],
-    email_service: EmailService = Depends(get_email_service),
-    api_key: str = Depends(get_api_key)
+    query: WelcomeQuery
 ):
     """Envía un email de bienvenida."""
+    email_service = get_email_service()
+    
     try:
-        company_obj = Company(**company.dict())
-        
         # Procesar el o los destinatarios
-        if isinstance(user, MultiEmailAddressBase):
-            recipients = user.to_email_addresses()
-            # Usamos el primer usuario para la plantilla
-            primary_user = recipients[0]
-        else:
-            recipients = [EmailAddress(**user.dict())]
-            primary_user = recipients[0]
-        
-        # Validar que se haya proporcionado dashboard_url
-        if 'dashboard_url' not in query:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST, 
-                detail="dashboard_url es requerido"
-            )
+        recipients, primary_user = _resolve_recipients(user)
         
-        email = WelcomeEmail(
-            company=company_obj,
-            user=primary_user,
-            dashboard_url=query.get('dashboard_url')
-        )
+        email, subject = _build_welcome(company, primary_user, query)
         
         result = email_service.send(
             email=email,
             to=recipients,
-            subject=f"¡Bienvenido a {company.name}!"
+            subject=subject
         )
         
         return {"status": "success", "message_id": result.get("id")}
     except (EmailServiceError, TemplateNotFoundError) as e:
         handle_email_service_error(e)
     except Exception as e:
-        logger.error(f"Error al enviar email de bienvenida: {str(e)}")
+        logger.error("Error al enviar email de bienvenida: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/password-reset", status_code=status.HTTP_200_OK)
 async def send_password_reset(
-    company: CompanyBase,
+    company: Company,
     user: Union[EmailAddressBase, MultiEmailAddressBase],
-    query: Dict[str, Any],
-    email_service: EmailService = Depends(get_email_service),
-    api_key: str = Depends(get_api_key)
+    query: PasswordResetQuery
 ):
     """Envía un email de restablecimiento de contraseña."""
+    email_service = get_email_service()
+    
     try:
-        company_obj = Company(**company.dict())
-        
         # Procesar el o los destinatarios
-        if isinstance(user, MultiEmailAddressBase):
-            recipients = user.to_email_addresses()
-            # Usamos el primer usuario para la plantilla
-            primary_user = recipients[0]
-        else:
-            recipients = [EmailAddress(**user.dict())]
-            primary_user = recipients[0]
+        recipients, primary_user = _resolve_recipients(user)
         
-        # Validar que se haya proporcionado reset_url
-        if 'reset_url' not in query:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST, 
-                detail="reset_url es requerido"
-            )
-        
-        email = PasswordResetEmail(
-            company=company_obj,
-            user=primary_user,
-            reset_url=query.get('reset_url'),
-            expires_in=query.get('expires_in', 24)
-        )
+        email, subject = _build_password_reset(company, primary_user, query)
         
         result = email_service.send(
             email=email,
             to=recipients,
-            subject="Restablecimiento de contraseña"
+            subject=subject
         )
         
         return {"status": "success", "message_id": result.get("id")}
     except (EmailServiceError, TemplateNotFoundError) as e:
         handle_email_service_error(e)
     except Exception as e:
-        logger.error(f"Error al enviar email de restablecimiento: {str(e)}")
+        logger.error("Error al enviar email de restablecimiento: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/notification", status_code=status.HTTP_200_OK)
 async def send_notification(
-    company: CompanyBase,
+    company: Company,
     user: Union[EmailAddressBase, MultiEmailAddressBase],
-    notification: NotificationBase,
-    query: Dict[str, Any],
-    email_service: EmailService = Depends(get_email_service),
-    api_key: str = Depends(get_api_key)
+    notification: Notification,
+    query: NotificationQuery
 ):
     """Envía un email de notificación."""
+    email_service = get_email_service()
+    
     try:
-        company_obj = Company(**company.dict())
-        notification_obj = Notification(**notification.dict())
-        
         # Procesar el o los destinatarios
-        if isinstance(user, MultiEmailAddressBase):
-            recipients = user.to_email_addresses()
-            # Usamos el primer usuario para la plantilla
-            primary_user = recipients[0]
-        else:
-            recipients = [EmailAddress(**user.dict())]
-            primary_user = recipients[0]
+        recipients, primary_user = _resolve_recipients(user)
         
         email = NotificationEmail(
-            company=company_obj,
+            company=company,
             user=primary_user,
-            notification=notification_obj,
-            preferences_url=query.get('preferences_url', '')
+            notification=notification,
+            preferences_url=query.preferences_url
         )
         
         result = email_service.send(
             email=email,
             to=recipients,
-            subject=notification_obj.title
+            subject=notification.title
         )
         
         return {"status": "success", "message_id": result.get("id")}
     except (EmailServiceError, TemplateNotFoundError) as e:
         handle_email_service_error(e)
     except Exception as e:
-        logger.error(f"Error al enviar email de notificación: {str(e)}")
+        logger.error("Error al enviar email de notificación: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.post("/alert", status_code=status.HTTP_200_OK)
 async def send_alert(
-    company: CompanyBase,
+    company: Company,
     user: Union[EmailAddressBase, MultiEmailAddressBase],
-    alert: AlertBase,
-    email_service: EmailService = Depends(get_email_service),
-    api_key: str = Depends(get_api_key)
+    alert: Alert
 ):
     """Envía un email de alerta."""
+    email_service = get_email_service()
+    
     try:
-        company_obj = Company(**company.dict())
-        alert_obj = Alert(**alert.dict())
-        
         # Procesar el o los destinatarios
-        if isinstance(user, MultiEmailAddressBase):
-            recipients = user.to_email_addresses()
-            # Usamos el primer usuario para la plantilla
-            primary_user = recipients[0]
-        else:
-            recipients = [EmailAddress(**user.dict())]
-            primary_user = recipients[0]
+        recipients, primary_user = _resolve_recipients(user)
         
-        email = AlertEmail(
-            company=company_obj,
-            user=primary_user,
-            alert=alert_obj
-        )
+        email, subject = _build_alert(company, primary_user, alert)
         
         result = email_service.send(
             email=email,
             to=recipients,
-            subject=alert.title
+            subject=subject
         )
         
         return {"status": "success", "message_id": result.get("id")}
     except (EmailServiceError, TemplateNotFoundError) as e:
         handle_email_service_error(e)
     except Exception as e:
-        logger.error(f"Error al enviar email de alerta: {str(e)}")
+        logger.error("Error al enviar email de alerta: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -0,0 +1,102 @@
+"""
+Clases de ruta personalizadas para la API FastAPI.
+Decodifican los cuerpos JSON de las peticiones con orjson en lugar de json
+y aceptan cuerpos comprimidos con gzip.
+"""
+import zlib
+from typing import Any, Callable, Coroutine
+
+import orjson
+from fastapi import HTTPException, Request, Response, status
+from fastapi.routing import APIRoute
+
+from email_system.core.config import settings
+
+
+def _gunzip_limited(body: bytes, limit: int) -> bytes:
+    """
+    Descomprime un cuerpo gzip sin producir más de limit bytes.
+    
+    Args:
+        body: Cuerpo comprimido
+        limit: Tamaño máximo permitido del cuerpo descomprimido
+        
+    Returns:
+        bytes: Cuerpo descomprimido
+        
+    Raises:
+        HTTPException: Si el cuerpo no es gzip válido (400) o descomprimido
+            supera el límite (413)
+    """
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    try:
+        # Se pide un byte más del límite para distinguir "justo en el
+        # límite" de "lo supera" sin descomprimir el resto
+        data = decompressor.decompress(body, limit + 1)
+    except zlib.error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cuerpo gzip inválido"
+        )
+    
+    if len(data) > limit or decompressor.unconsumed_tail:
+        raise HTTPException(
+            status_code=413,
+            detail="Cuerpo descomprimido demasiado grande"
+        )
+    if not decompressor.eof:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cuerpo gzip inválido"
+        )
+    return data
+
+
+class ORJSONRequest(Request):
+    """Request cuyo cuerpo JSON se decodifica con orjson."""
+    
+    async def body(self) -> bytes:
+        """
+        Retorna el cuerpo de la petición, descomprimiéndolo si llega con gzip.
+        
+        Returns:
+            bytes: Cuerpo de la petición
+            
+        Raises:
+            HTTPException: Si el cuerpo declara gzip pero no es válido (400)
+                o descomprimido supera MAX_DECOMPRESSED_BODY_SIZE (413)
+        """
+        if not hasattr(self, "_decoded_body"):
+            body = await super().body()
+            if self.headers.get("Content-Encoding", "").lower() == "gzip":
+                body = _gunzip_limited(body, settings.MAX_DECOMPRESSED_BODY_SIZE)
+            self._decoded_body = body
+        return self._decoded_body
+    
+    async def json(self) -> Any:
+        """
+        Decodifica el cuerpo de la petición.
+        
+        Returns:
+            Any: Cuerpo JSON decodificado
+            
+        Raises:
+            orjson.JSONDecodeError: Si el cuerpo no es JSON válido (subclase
+                de json.JSONDecodeError, por lo que FastAPI responde 422)
+        """
+        if not hasattr(self, "_json"):
+            self._json = orjson.loads(await self.body())
+        return self._json
+
+
+class ORJSONRoute(APIRoute):
+    """APIRoute que entrega a los endpoints un ORJSONRequest."""
+    
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        original_route_handler = super().get_route_handler()
+        
+        async def custom_route_handler(request: Request) -> Response:
+            request = ORJSONRequest(request.scope, request.receive)
+            return await original_route_handler(request)
+        
+        return custom_route_handler
\ No newline at end of file
@@ -3,34 +3,378 @@ Componentes de formularios para la GUI del cliente.
 Proporciona formularios para los diferentes tipos de email.
 """
 import logging
-from typing import List, Dict, Any, Tuple, Optional, Callable
+import re
+from email.utils import parseaddr
+from types import MappingProxyType
+from typing import List, Dict, Any, Tuple, Optional, Callable, NamedTuple, TypedDict, cast
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QGroupBox, 
-    QFormLayout, QLineEdit, QTextEdit, QComboBox, 
-    QSpinBox, QCheckBox, QPushButton, QLabel
+    QFormLayout, QLineEdit, QPlainTextEdit, QComboBox, 
+    QSpinBox, QCheckBox, QPushButton, QLabel, QStackedWidget
+)
+from PyQt5.QtCore import (
+    QObject, QRegularExpression, QRunnable, QThreadPool, QTimer, pyqtSignal
+)
+from PyQt5.QtGui import (
+    QColor, QRegularExpressionValidator, QSyntaxHighlighter, QTextCharFormat
 )
-from PyQt5.QtCore import Qt, pyqtSignal
 
 
 logger = logging.getLogger(__name__)
 
+# Tiempo (ms) sin escribir tras el que se procesa el texto de un campo
+EDIT_DEBOUNCE_MS = 150
+
+# Tiempo (ms) sin cambios tras el que un formulario emite form_changed
+FORM_DEBOUNCE_MS = 120
+
+# Valores predeterminados de los campos de URL
+DEFAULT_COMPANY_WEBSITE = "https://miempresa.com"
+DEFAULT_COMPANY_LOGO = "https://miempresa.com/logo.png"
+DEFAULT_DASHBOARD_URL = "https://miempresa.com/dashboard"
+DEFAULT_RESET_URL = "https://miempresa.com/reset-password"
+DEFAULT_NOTIFICATION_ICON = "https://miempresa.com/icons/notification.png"
+DEFAULT_ACTION_URL = "https://miempresa.com/action"
+DEFAULT_PREFERENCES_URL = "https://miempresa.com/preferences"
+
+# Textos predeterminados de los campos (compartidos por los formularios
+# individuales y el de lote)
+DEFAULT_USER_NAME = "Usuario de Prueba"
+DEFAULT_NOTIFICATION_TITLE = "Notificación Importante"
+DEFAULT_NOTIFICATION_MESSAGE = "Este es un mensaje de notificación de prueba."
+DEFAULT_NOTIFICATION_ACTION_TEXT = "Ver Detalles"
+DEFAULT_NOTIFICATION_ADDITIONAL_INFO = "Información adicional sobre esta notificación."
+DEFAULT_ALERT_TITLE = "Alerta de Seguridad"
+DEFAULT_ALERT_MESSAGE = "Este es un mensaje de alerta de prueba."
+DEFAULT_ALERT_STEPS = "Paso 1: Verificar conexión\nPaso 2: Actualizar contraseña\nPaso 3: Cerrar sesiones"
+DEFAULT_ALERT_ACTION_TEXT = "Resolver Ahora"
+
+# Textos de ayuda de los campos multilínea
+EMAIL_LINE_PLACEHOLDER = "Ingrese un email por línea"
+STEPS_PLACEHOLDER = "Un paso por línea"
+
+# Validación sintáctica básica de un email (compilada una sola vez)
+EMAIL_PATTERN = r'^[^@\s,;]+@[^@\s,;]+\.[^@\s,;]+$'
+_EMAIL_RE = re.compile(EMAIL_PATTERN)
+
+# Color con el que se marcan los emails inválidos
+INVALID_EMAIL_COLOR = "#d32f2f"
+
+# Textos de destinatarios a partir de este tamaño se analizan en segundo plano
+ASYNC_PARSE_MIN_CHARS = 20000
+
+
+class Recipient(NamedTuple):
+    """
+    Destinatario de un envío en lote.
+    
+    Ocupa bastante menos que un diccionario en listas grandes; se convierte
+    con _asdict() solo al enviarlo a la API.
+    """
+    email: str
+    name: str
+
+
+class UserData(TypedDict):
+    """Destinatarios de un email individual, en listas paralelas."""
+    names: List[str]
+    emails: List[str]
+
+
+class NotificationData(TypedDict):
+    """Contenido de una notificación."""
+    title: str
+    message: str
+    type: str
+    icon: Optional[str]
+    action_url: Optional[str]
+    action_text: Optional[str]
+    additional_info: Optional[str]
+
+
+class BatchNotificationData(NotificationData):
+    """Contenido de una notificación en lote, con la URL de preferencias."""
+    preferences_url: str
+
+
+class AlertData(TypedDict):
+    """Contenido de una alerta."""
+    title: str
+    message: str
+    type: str
+    steps: Optional[List[str]]
+    action_url: Optional[str]
+    action_text: Optional[str]
+    contact_support: bool
+
+
+def _split_recipient_line(line: str) -> Tuple[str, str]:
+    """
+    Separa una línea de destinatario (ya sin espacios en los extremos).
+    
+    Admite "email, nombre", "email; nombre" y el formato RFC 5322
+    "Nombre <email>".
+    
+    Returns:
+        Tuple[str, str]: Email y nombre ("" si no hay)
+    """
+    # Solo es "Nombre <email>" si no hay separador antes del '<': en
+    # "email, Nombre <alias>" el '<' pertenece al nombre
+    angle = line.find('<')
+    if angle != -1 and ',' not in line[:angle] and ';' not in line[:angle]:
+        name, email = parseaddr(line)
+        if email:
+            return email, name
+    
+    # Separar por la primera coma o punto y coma. La línea ya no tiene
+    # espacios en los extremos: solo hay que recortar junto al separador
+    email, _, name = line.partition(',')
+    if ';' in email:
+        email, _, name = line.partition(';')
+    
+    return email.rstrip(), name.lstrip()
+
+
+def _parse_recipient_text(text: str) -> Tuple[List[str], List[str]]:
+    """
+    Analiza un texto con un destinatario por línea ("email, nombre" o
+    "Nombre <email>").
+    
+    No usa Qt, por lo que puede ejecutarse fuera del hilo de la interfaz.
+    
+    Returns:
+        Tuple[List[str], List[str]]: Emails y nombres, en listas paralelas
+    """
+    # Lista de solo emails (lo habitual al pegar una columna): no hay nada
+    # que separar en cada línea
+    if ',' not in text and ';' not in text and '<' not in text:
+        emails = [line for line in map(str.strip, text.splitlines()) if line]
+        return emails, [""] * len(emails)
+    
+    emails = []
+    names = []
+    # Enlaces locales: evitan buscar el atributo en cada iteración
+    add_email = emails.append
+    add_name = names.append
+    split_line = _split_recipient_line
+    
+    # splitlines también corta en "\r\n", así que no quedan "\r" pegados
+    # a los emails cuando se pega texto con finales de línea de Windows
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        
+        email, name = split_line(line)
+        if email:
+            add_email(email)
+            add_name(name)
+    
+    return emails, names
+
+
+class _ParserSignals(QObject):
+    """Señales del analizador de destinatarios en segundo plano."""
+    
+    # Número de edición analizada, emails y nombres
+    finished = pyqtSignal(int, object, object)
+
+
+class _RecipientParser(QRunnable):
+    """Tarea del QThreadPool que analiza un texto de destinatarios."""
+    
+    def __init__(self, text: str, seq: int):
+        super().__init__()
+        self.text = text
+        self.seq = seq
+        self.signals = _ParserSignals()
+    
+    def run(self):
+        emails, names = _parse_recipient_text(self.text)
+        self.signals.finished.emit(self.seq, emails, names)
+
+
+def _parse_steps(text: str) -> Optional[List[str]]:
+    """
+    Obtiene los pasos no vacíos de un texto con un paso por línea.
+    
+    Returns:
+        Optional[List[str]]: Pasos, o None si el texto no contiene ninguno
+    """
+    # Caso habitual: campo vacío o solo con espacios
+    if not text or text.isspace():
+        return None
+    
+    return [step for step in map(str.strip, text.splitlines()) if step] or None
+
+
+def _parse_recipients(text: str) -> List[Recipient]:
+    """
+    Analiza un texto de destinatarios y devuelve un Recipient por destinatario.
+    
+    Las líneas cuyo email no tiene un formato válido se descartan (el editor
+    ya las marca con _RecipientHighlighter).
+    """
+    emails, names = _parse_recipient_text(text)
+    match = _EMAIL_RE.match
+    return [
+        Recipient(email, name)
+        for email, name in zip(emails, names)
+        if match(email)
+    ]
+
+
+class _TextCache:
+    """
+    Texto de un editor (o el resultado de analizarlo) recalculado solo cuando cambia.
+    
+    Usa document().revision(), que Qt incrementa en cada modificación del
+    documento, para saber si el valor guardado sigue siendo válido.
+    """
+    
+    def __init__(self, editor, parse: Optional[Callable[[str], Any]] = None):
+        self._editor = editor
+        self._parse = parse
+        self._revision = -1
+        self._value = None
+    
+    def get(self) -> Any:
+        """Obtiene el valor actual, analizando el texto solo si cambió."""
+        revision = self._editor.document().revision()
+        if revision != self._revision:
+            text = self._editor.toPlainText()
+            self._value = self._parse(text) if self._parse else text
+            self._revision = revision
+        return self._value
+
+
+class _RecipientHighlighter(QSyntaxHighlighter):
+    """
+    Subraya los emails con formato inválido en un editor de destinatarios.
+    
+    Qt llama a highlightBlock solo para las líneas que cambian, así que el
+    coste de validar no depende del número total de destinatarios.
+    """
+    
+    def __init__(self, document):
+        super().__init__(document)
+        self._invalid_format = QTextCharFormat()
+        self._invalid_format.setForeground(QColor(INVALID_EMAIL_COLOR))
+        self._invalid_format.setUnderlineStyle(QTextCharFormat.WaveUnderline)
+        self._invalid_format.setUnderlineColor(QColor(INVALID_EMAIL_COLOR))
+    
+    def highlightBlock(self, text):
+        # Misma separación que _parse_recipient_text. parseaddr normaliza el
+        # email (p. ej. quita espacios), así que puede no aparecer tal cual
+        email, _ = _split_recipient_line(text.strip())
+        if email and not _EMAIL_RE.match(email):
+            start = text.find(email)
+            if start != -1:
+                self.setFormat(start, len(email), self._invalid_format)
 
-class CompanyForm(QGroupBox):
+
+class _ChangeDebounceMixin:
+    """
+    Agrupa los cambios de los campos de un formulario en una sola señal form_changed.
+    
+    Los campos se conectan a _on_any_change, que reinicia un temporizador;
+    form_changed se emite cuando deja de haber cambios durante FORM_DEBOUNCE_MS.
+    
+    También guarda los datos del formulario: get_form_data solo los vuelve a
+    leer de los widgets después de un cambio.
+    """
+    
+    def _init_change_timer(self):
+        """Crea el temporizador de cambios del formulario."""
+        self._form_data: Optional[Dict[str, Any]] = None
+        self._change_timer = QTimer(self)
+        self._change_timer.setSingleShot(True)
+        self._change_timer.setInterval(FORM_DEBOUNCE_MS)
+        self._change_timer.timeout.connect(self.form_changed.emit)
+    
+    def _on_any_change(self):
+        """Registra un cambio en cualquier campo del formulario."""
+        self._form_data = None
+        self._change_timer.start()
+    
+    def _invalidate_form_data(self):
+        """Descarta los datos en caché sin notificar ningún cambio."""
+        self._form_data = None
+    
+    def get_form_data(self) -> Dict[str, Any]:
+        """
+        Obtiene los datos del formulario.
+        
+        El diccionario devuelto se reutiliza hasta el siguiente cambio, por lo
+        que no debe modificarse.
+        """
+        if self._form_data is None:
+            self._form_data = self._build_form_data()
+        return self._form_data
+    
+    def _wire_changed(self, widgets):
+        """Conecta la señal de cambio de cada campo con _on_any_change."""
+        for widget in widgets:
+            if isinstance(widget, QComboBox):
+                signal = widget.currentIndexChanged
+            elif isinstance(widget, QSpinBox):
+                signal = widget.valueChanged
+            elif isinstance(widget, QCheckBox):
+                signal = widget.stateChanged
+            else:
+                # QLineEdit y QPlainTextEdit
+                signal = widget.textChanged
+            signal.connect(self._on_any_change)
+
+
+class _LazyUiMixin:
+    """
+    Difiere la construcción de la interfaz hasta que el formulario se muestra.
+    
+    Los formularios de tipos de email que el usuario no abre nunca no llegan
+    a crear sus widgets. Cualquier acceso a los campos desde fuera debe pasar
+    antes por _ensure_ui.
+    """
+    
+    _ui_built = False
+    
+    def _ensure_ui(self):
+        """Construye la interfaz si todavía no se ha construido."""
+        if not self._ui_built:
+            self._ui_built = True
+            self._setup_ui()
+    
+    def showEvent(self, event):
+        self._ensure_ui()
+        super().showEvent(event)
+
+
+class CompanyForm(_ChangeDebounceMixin, QGroupBox):
     """Formulario para la información de la empresa."""
     
+    # Redes sociales de la empresa (fijas en el cliente)
+    _SOCIAL_MEDIA = MappingProxyType({
+        "facebook": "https://facebook.com/miempresa",
+        "twitter": "https://twitter.com/miempresa",
+        "instagram": "https://instagram.com/miempresa"
+    })
+    
     # Señal que se emite cuando cambia cualquier campo
     form_changed = pyqtSignal()
     
     def __init__(self, parent=None):
         super().__init__("Información de la Empresa", parent)
+        self._init_change_timer()
         self._setup_ui()
         
         # Conectar señales de cambio
-        self.company_name.textChanged.connect(self.form_changed.emit)
-        self.company_address.textChanged.connect(self.form_changed.emit)
-        self.company_email.textChanged.connect(self.form_changed.emit)
-        self.company_website.textChanged.connect(self.form_changed.emit)
-        self.company_logo.textChanged.connect(self.form_changed.emit)
+        self._wire_changed((
+            self.company_name,
+            self.company_address,
+            self.company_email,
+            self.company_website,
+            self.company_logo
+        ))
     
     def _setup_ui(self):
         """Configura la interfaz de usuario."""
@@ -39,8 +383,11 @@ class CompanyForm(QGroupBox):
         self.company_name = QLineEdit("Mi Empresa")
         self.company_address = QLineEdit("Calle Principal 123")
         self.company_email = QLineEdit("soporte@miempresa.com")
-        self.company_website = QLineEdit("https://miempresa.com")
-        self.company_logo = QLineEdit("https://miempresa.com/logo.png")
+        self.company_email.setValidator(
+            QRegularExpressionValidator(QRegularExpression(EMAIL_PATTERN), self)
+        )
+        self.company_website = QLineEdit(DEFAULT_COMPANY_WEBSITE)
+        self.company_logo = QLineEdit(DEFAULT_COMPANY_LOGO)
         
         form_layout.addRow("Nombre:", self.company_name)
         form_layout.addRow("Dirección:", self.company_address)
@@ -49,18 +396,24 @@ class CompanyForm(QGroupBox):
         form_layout.addRow("Logo URL:", self.company_logo)
     
     def get_company_data(self) -> Dict[str, Any]:
-        """Obtiene los datos de la empresa del formulario."""
+        """
+        Obtiene los datos de la empresa del formulario.
+        
+        Se leen de los widgets solo tras un cambio; el diccionario devuelto
+        se reutiliza entre vistas previas y no debe modificarse.
+        """
+        return self.get_form_data()
+    
+    def _build_form_data(self) -> Dict[str, Any]:
+        """Lee los datos de la empresa de los widgets."""
         return {
             "name": self.company_name.text(),
             "address": self.company_address.text(),
             "support_email": self.company_email.text(),
             "website": self.company_website.text(),
             "logo_url": self.company_logo.text(),
-            "social_media": {
-                "facebook": "https://facebook.com/miempresa",
-                "twitter": "https://twitter.com/miempresa",
-                "instagram": "https://instagram.com/miempresa"
-            }
+            # Copia: los datos se serializan a JSON y no admiten mappingproxy
+            "social_media": dict(self._SOCIAL_MEDIA)
         }
 
 
@@ -70,9 +423,22 @@ class RecipientsField(QWidget):
     # Señal que se emite cuando cambia el campo
     field_changed = pyqtSignal()
     
-    def __init__(self, placeholder="Ingrese un email por línea", parent=None):
+    # Señal inmediata (sin esperar al análisis) cuando cambia el texto
+    content_changed = pyqtSignal()
+    
+    def __init__(self, placeholder=EMAIL_LINE_PLACEHOLDER, parent=None):
         super().__init__(parent)
         self.recipient_names = []
+        
+        # Resultado del último análisis del texto; se recalcula solo tras editarlo
+        self._cached_emails: List[str] = []
+        self._cached_names: List[str] = []
+        self._dirty = True
+        
+        # Número de edición del texto, para descartar análisis obsoletos
+        self._edit_seq = 0
+        self._active_parser: Optional[_RecipientParser] = None
+        
         self._setup_ui(placeholder)
     
     def _setup_ui(self, placeholder):
@@ -81,93 +447,156 @@ class RecipientsField(QWidget):
         layout.setContentsMargins(0, 0, 0, 0)
         
         # Campo de texto para ingresar emails
-        self.email_field = QTextEdit()
+        self.email_field = QPlainTextEdit()
         self.email_field.setPlaceholderText(placeholder)
         self.email_field.setMaximumHeight(80)  # Limitar altura
+        self._highlighter = _RecipientHighlighter(self.email_field.document())
         
         # Etiqueta para mostrar contador de destinatarios
         self.counter = QLabel("0 destinatarios")
         self.counter.setStyleSheet("color: gray; font-size: 10px;")
         
-        # Actualizar contador cuando cambia el texto
-        self.email_field.textChanged.connect(self._update_counter)
-        self.email_field.textChanged.connect(self.field_changed.emit)
+        # Agrupar las pulsaciones seguidas en una sola actualización: cada
+        # cambio de texto reinicia el temporizador
+        self._update_timer = QTimer(self)
+        self._update_timer.setSingleShot(True)
+        self._update_timer.setInterval(EDIT_DEBOUNCE_MS)
+        self._update_timer.timeout.connect(self._do_update)
+        self.email_field.textChanged.connect(self._mark_dirty)
+        self.email_field.textChanged.connect(self._update_timer.start)
         
         layout.addWidget(self.email_field)
         layout.addWidget(self.counter)
     
-    def _update_counter(self):
-        """Actualiza el contador de destinatarios."""
+    def _mark_dirty(self):
+        """Invalida el análisis en caché del texto."""
+        self._dirty = True
+        self._edit_seq += 1
+        self.content_changed.emit()
+    
+    def _do_update(self):
+        """Actualiza el contador y notifica el cambio una vez que el usuario deja de escribir."""
+        if not self._dirty:
+            self._update_counter()
+            self.field_changed.emit()
+            return
+        
         text = self.email_field.toPlainText()
-        emails = [email.strip() for email in text.split('\n') if email.strip()]
-        self.counter.setText(f"{len(emails)} destinatario{'s' if len(emails) != 1 else ''}")
+        if len(text) < ASYNC_PARSE_MIN_CHARS:
+            self._on_parsed(self._edit_seq, *_parse_recipient_text(text))
+            return
+        
+        # Textos grandes (por ejemplo, al pegar miles de líneas) se analizan
+        # en el pool de hilos para no bloquear la interfaz
+        parser = _RecipientParser(text, self._edit_seq)
+        parser.signals.finished.connect(self._on_parsed)
+        self._active_parser = parser
+        QThreadPool.globalInstance().start(parser)
+    
+    def _on_parsed(self, seq: int, emails: List[str], names: List[str]):
+        """Guarda el resultado de un análisis si corresponde al texto actual."""
+        if seq != self._edit_seq:
+            # El texto cambió mientras se analizaba; llegará otro análisis
+            return
+        
+        self._cached_emails = emails
+        self._cached_names = names
+        self._dirty = False
+        self._active_parser = None
+        self._update_counter()
+        self.field_changed.emit()
+    
+    def _ensure_parsed(self):
+        """Analiza el texto del campo si cambió desde el último análisis."""
+        if not self._dirty:
+            return
+        
+        self._cached_emails, self._cached_names = _parse_recipient_text(
+            self.email_field.toPlainText()
+        )
+        self._dirty = False
+    
+    def _update_counter(self):
+        """Actualiza el contador de destinatarios a partir del análisis en caché."""
+        count = len(self._cached_emails)
+        self.counter.setText(f"{count} destinatario{'s' if count != 1 else ''}")
     
     def get_emails(self) -> List[str]:
         """Obtiene la lista de emails."""
-        text = self.email_field.toPlainText()
-        return [email.strip() for email in text.split('\n') if email.strip()]
+        self._ensure_parsed()
+        return list(self._cached_emails)
     
     def set_emails(self, emails: List[str], names: Optional[List[str]] = None):
         """Establece los emails y nombres en el campo."""
-        text_lines = []
-        for i, email in enumerate(emails):
-            name = ""
-            if names and i < len(names) and names[i]:
-                name = names[i]
-            text_lines.append(f"{email}, {name}" if name else email)
-        
-        self.email_field.setText("\n".join(text_lines))
-        self.recipient_names = names or []
+        names = names or []
+        emails = list(emails)
+        # Nombres alineados con los emails ("" donde no hay nombre)
+        padded_names = [
+            (names[i] or "") if i < len(names) else ""
+            for i in range(len(emails))
+        ]
+        text_lines = [
+            f"{email}, {name}" if name else email
+            for email, name in zip(emails, padded_names)
+        ]
+        
+        # Los datos ya están separados: se guardan directamente en la caché
+        # y se bloquean las señales para no volver a analizar el texto
+        self.email_field.blockSignals(True)
+        self.email_field.setPlainText("\n".join(text_lines))
+        self.email_field.blockSignals(False)
+        
+        # Descartar cualquier análisis pendiente del texto anterior
+        self._update_timer.stop()
+        self._edit_seq += 1
+        self._active_parser = None
+        
+        self._cached_emails = emails
+        self._cached_names = padded_names
+        self._dirty = False
+        self.recipient_names = names
         self._update_counter()
+        self.content_changed.emit()
     
     def get_recipients(self) -> List[Tuple[str, str]]:
         """Obtiene la lista de (email, nombre) del campo."""
-        text = self.email_field.toPlainText()
-        recipients = []
-        
-        for line in text.split('\n'):
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Intentar separar por coma o punto y coma
-            if ',' in line:
-                parts = line.split(',', 1)
-            elif ';' in line:
-                parts = line.split(';', 1)
-            else:
-                # Solo email sin nombre
-                parts = [line, ""]
-            
-            email = parts[0].strip()
-            name = parts[1].strip() if len(parts) > 1 else ""
-            
-            if email:
-                recipients.append((email, name))
-        
-        return recipients
+        self._ensure_parsed()
+        return list(zip(self._cached_emails, self._cached_names))
+    
+    def get_valid_recipients(self) -> List[Tuple[str, str]]:
+        """Obtiene los (email, nombre) del campo cuyo email tiene un formato válido."""
+        self._ensure_parsed()
+        match = _EMAIL_RE.match
+        return [
+            (email, name)
+            for email, name in zip(self._cached_emails, self._cached_names)
+            if match(email)
+        ]
+    
+    def get_split(self) -> Tuple[List[str], List[str]]:
+        """Obtiene las listas paralelas de emails y nombres del campo."""
+        self._ensure_parsed()
+        return list(self._cached_emails), list(self._cached_names)
 
 
-class WelcomeEmailForm(QWidget):
-    """Formulario para email de bienvenida."""
+class _UserBlock(QGroupBox):
+    """Grupo "Información del Usuario" compartido por los formularios de email individual."""
     
     # Señal que se emite cuando cambia cualquier campo
     form_changed = pyqtSignal()
     
+    # Señal inmediata cuando cambian los destinatarios, antes de analizarlos
+    content_changed = pyqtSignal()
+    
     def __init__(self, parent=None):
-        super().__init__(parent)
+        super().__init__("Información del Usuario", parent)
         self._setup_ui()
     
     def _setup_ui(self):
         """Configura la interfaz de usuario."""
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(0, 0, 0, 0)
-        
-        # Información del usuario
-        user_group = QGroupBox("Información del Usuario")
-        user_layout = QFormLayout(user_group)
+        self.form_layout = QFormLayout(self)
         
-        self.user_name = QLineEdit("Usuario de Prueba")
+        self.user_name = QLineEdit(DEFAULT_USER_NAME)
         self.user_name.textChanged.connect(self.form_changed.emit)
         
         # Campo de emails
@@ -175,8 +604,9 @@ class WelcomeEmailForm(QWidget):
         email_container_layout = QHBoxLayout(self.user_email_container)
         email_container_layout.setContentsMargins(0, 0, 0, 0)
         
-        self.user_email = RecipientsField("Ingrese un email por línea")
+        self.user_email = RecipientsField(EMAIL_LINE_PLACEHOLDER)
         self.user_email.field_changed.connect(self.form_changed.emit)
+        self.user_email.content_changed.connect(self.content_changed.emit)
         self.user_email.set_emails(["usuario@ejemplo.com"])
         
         manage_recipients_button = QPushButton("Gestionar Destinatarios")
@@ -185,17 +615,12 @@ class WelcomeEmailForm(QWidget):
         email_container_layout.addWidget(self.user_email)
         email_container_layout.addWidget(manage_recipients_button)
         
-        self.dashboard_url = QLineEdit("https://miempresa.com/dashboard")
-        self.dashboard_url.textChanged.connect(self.form_changed.emit)
-        
-        user_layout.addRow("Nombre por defecto:", self.user_name)
-        user_layout.addRow("Email(s):", self.user_email_container)
-        user_layout.addRow("Dashboard URL:", self.dashboard_url)
-        
-        layout.addWidget(user_group)
-        
-        # Añadir espacio al final
-        layout.addStretch()
+        self.form_layout.addRow("Nombre por defecto:", self.user_name)
+        self.form_layout.addRow("Email(s):", self.user_email_container)
+    
+    def add_row(self, label: str, widget: QWidget):
+        """Añade un campo adicional al grupo."""
+        self.form_layout.addRow(label, widget)
     
     def _manage_recipients(self):
         """Abre diálogo para gestionar destinatarios."""
@@ -203,32 +628,25 @@ class WelcomeEmailForm(QWidget):
         # para gestionar los destinatarios con nombres personalizados
         logger.debug("Gestionar destinatarios (no implementado)")
     
-    def get_form_data(self) -> Dict[str, Any]:
-        """Obtiene los datos del formulario."""
-        recipients = self.user_email.get_recipients()
-        emails = [email for email, _ in recipients]
-        names = [name for _, name in recipients]
+    def get_user_data(self) -> UserData:
+        """Obtiene los destinatarios en el formato de la API."""
+        emails, names = self.user_email.get_split()
         
         return {
-            "user": {
-                "names": names,
-                "emails": emails
-            },
-            "query": {
-                "dashboard_url": self.dashboard_url.text()
-            }
+            "names": names,
+            "emails": emails
         }
 
 
-class PasswordResetForm(QWidget):
-    """Formulario para email de restablecimiento de contraseña."""
+class WelcomeEmailForm(_LazyUiMixin, _ChangeDebounceMixin, QWidget):
+    """Formulario para email de bienvenida."""
     
     # Señal que se emite cuando cambia cualquier campo
     form_changed = pyqtSignal()
     
     def __init__(self, parent=None):
         super().__init__(parent)
-        self._setup_ui()
+        self._init_change_timer()
     
     def _setup_ui(self):
         """Configura la interfaz de usuario."""
@@ -236,62 +654,82 @@ class PasswordResetForm(QWidget):
         layout.setContentsMargins(0, 0, 0, 0)
         
         # Información del usuario
-        user_group = QGroupBox("Información del Usuario")
-        user_layout = QFormLayout(user_group)
+        self.user_block = _UserBlock()
+        self.user_block.form_changed.connect(self._on_any_change)
+        self.user_block.content_changed.connect(self._invalidate_form_data)
+        self.user_name = self.user_block.user_name
+        self.user_email = self.user_block.user_email
         
-        self.user_name = QLineEdit("Usuario de Prueba")
-        self.user_name.textChanged.connect(self.form_changed.emit)
+        self.dashboard_url = QLineEdit(DEFAULT_DASHBOARD_URL)
         
-        # Campo de emails
-        self.user_email_container = QWidget()
-        email_container_layout = QHBoxLayout(self.user_email_container)
-        email_container_layout.setContentsMargins(0, 0, 0, 0)
+        # Conectar señales de cambio
+        self._wire_changed((self.dashboard_url,))
         
-        self.user_email = RecipientsField("Ingrese un email por línea")
-        self.user_email.field_changed.connect(self.form_changed.emit)
-        self.user_email.set_emails(["usuario@ejemplo.com"])
+        self.user_block.add_row("Dashboard URL:", self.dashboard_url)
         
-        manage_recipients_button = QPushButton("Gestionar Destinatarios")
-        manage_recipients_button.clicked.connect(self._manage_recipients)
+        layout.addWidget(self.user_block)
         
-        email_container_layout.addWidget(self.user_email)
-        email_container_layout.addWidget(manage_recipients_button)
+        # Añadir espacio al final
+        layout.addStretch()
+    
+    def _build_form_data(self) -> Dict[str, Any]:
+        """Lee los datos del formulario de los widgets."""
+        self._ensure_ui()
+        return {
+            "user": self.user_block.get_user_data(),
+            "query": {
+                "dashboard_url": self.dashboard_url.text()
+            }
+        }
+
+
+class PasswordResetForm(_LazyUiMixin, _ChangeDebounceMixin, QWidget):
+    """Formulario para email de restablecimiento de contraseña."""
+    
+    # Señal que se emite cuando cambia cualquier campo
+    form_changed = pyqtSignal()
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._init_change_timer()
+    
+    def _setup_ui(self):
+        """Configura la interfaz de usuario."""
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        
+        # Información del usuario
+        self.user_block = _UserBlock()
+        self.user_block.form_changed.connect(self._on_any_change)
+        self.user_block.content_changed.connect(self._invalidate_form_data)
+        self.user_name = self.user_block.user_name
+        self.user_email = self.user_block.user_email
         
-        self.reset_url = QLineEdit("https://miempresa.com/reset-password")
-        self.reset_url.textChanged.connect(self.form_changed.emit)
+        self.reset_url = QLineEdit(DEFAULT_RESET_URL)
         
         self.expires_in = QSpinBox()
         self.expires_in.setValue(24)
         self.expires_in.setRange(1, 72)
-        self.expires_in.valueChanged.connect(self.form_changed.emit)
         
-        user_layout.addRow("Nombre por defecto:", self.user_name)
-        user_layout.addRow("Email(s):", self.user_email_container)
-        user_layout.addRow("Reset URL:", self.reset_url)
-        user_layout.addRow("Expira en (horas):", self.expires_in)
+        # Conectar señales de cambio
+        self._wire_changed((
+            self.reset_url,
+            self.expires_in
+        ))
+        
+        self.user_block.add_row("Reset URL:", self.reset_url)
+        self.user_block.add_row("Expira en (horas):", self.expires_in)
         
-        layout.addWidget(user_group)
+        layout.addWidget(self.user_block)
         
         # Añadir espacio al final
         layout.addStretch()
     
-    def _manage_recipients(self):
-        """Abre diálogo para gestionar destinatarios."""
-        # En una implementación completa, aquí se abriría un diálogo
-        # para gestionar los destinatarios con nombres personalizados
-        logger.debug("Gestionar destinatarios (no implementado)")
-    
-    def get_form_data(self) -> Dict[str, Any]:
-        """Obtiene los datos del formulario."""
-        recipients = self.user_email.get_recipients()
-        emails = [email for email, _ in recipients]
-        names = [name for _, name in recipients]
-        
+    def _build_form_data(self) -> Dict[str, Any]:
+        """Lee los datos del formulario de los widgets."""
+        self._ensure_ui()
         return {
-            "user": {
-                "names": names,
-                "emails": emails
-            },
+            "user": self.user_block.get_user_data(),
             "query": {
                 "reset_url": self.reset_url.text(),
                 "expires_in": self.expires_in.value()
@@ -299,7 +737,7 @@ class PasswordResetForm(QWidget):
         }
 
 
-class NotificationForm(QWidget):
+class NotificationForm(_LazyUiMixin, _ChangeDebounceMixin, QWidget):
     """Formulario para email de notificación."""
     
     # Señal que se emite cuando cambia cualquier campo
@@ -307,7 +745,7 @@ class NotificationForm(QWidget):
     
     def __init__(self, parent=None):
         super().__init__(parent)
-        self._setup_ui()
+        self._init_change_timer()
     
     def _setup_ui(self):
         """Configura la interfaz de usuario."""
@@ -315,60 +753,48 @@ class NotificationForm(QWidget):
         layout.setContentsMargins(0, 0, 0, 0)
         
         # Información del usuario
-        user_group = QGroupBox("Información del Usuario")
-        user_layout = QFormLayout(user_group)
-        
-        self.user_name = QLineEdit("Usuario de Prueba")
-        self.user_name.textChanged.connect(self.form_changed.emit)
-        
-        # Campo de emails
-        self.user_email_container = QWidget()
-        email_container_layout = QHBoxLayout(self.user_email_container)
-        email_container_layout.setContentsMargins(0, 0, 0, 0)
-        
-        self.user_email = RecipientsField("Ingrese un email por línea")
-        self.user_email.field_changed.connect(self.form_changed.emit)
-        self.user_email.set_emails(["usuario@ejemplo.com"])
+        self.user_block = _UserBlock()
+        self.user_block.form_changed.connect(self._on_any_change)
+        self.user_block.content_changed.connect(self._invalidate_form_data)
+        self.user_name = self.user_block.user_name
+        self.user_email = self.user_block.user_email
         
-        manage_recipients_button = QPushButton("Gestionar Destinatarios")
-        manage_recipients_button.clicked.connect(self._manage_recipients)
-        
-        email_container_layout.addWidget(self.user_email)
-        email_container_layout.addWidget(manage_recipients_button)
-        
-        user_layout.addRow("Nombre por defecto:", self.user_name)
-        user_layout.addRow("Email(s):", self.user_email_container)
-        
-        layout.addWidget(user_group)
+        layout.addWidget(self.user_block)
         
         # Contenido de la notificación
         notification_group = QGroupBox("Contenido de la Notificación")
         notification_layout = QFormLayout(notification_group)
         
-        self.notification_title = QLineEdit("Notificación Importante")
-        self.notification_title.textChanged.connect(self.form_changed.emit)
+        self.notification_title = QLineEdit(DEFAULT_NOTIFICATION_TITLE)
         
-        self.notification_message = QTextEdit("Este es un mensaje de notificación de prueba.")
-        self.notification_message.textChanged.connect(self.form_changed.emit)
+        self.notification_message = QPlainTextEdit(DEFAULT_NOTIFICATION_MESSAGE)
         
         self.notification_type = QComboBox()
         self.notification_type.addItems(["success", "warning", "error", "info"])
-        self.notification_type.currentIndexChanged.connect(self.form_changed.emit)
         
-        self.notification_icon = QLineEdit("https://miempresa.com/icons/notification.png")
-        self.notification_icon.textChanged.connect(self.form_changed.emit)
+        self.notification_icon = QLineEdit(DEFAULT_NOTIFICATION_ICON)
         
-        self.notification_action_url = QLineEdit("https://miempresa.com/action")
-        self.notification_action_url.textChanged.connect(self.form_changed.emit)
+        self.notification_action_url = QLineEdit(DEFAULT_ACTION_URL)
         
-        self.notification_action_text = QLineEdit("Ver Detalles")
-        self.notification_action_text.textChanged.connect(self.form_changed.emit)
+        self.notification_action_text = QLineEdit(DEFAULT_NOTIFICATION_ACTION_TEXT)
         
-        self.notification_additional_info = QTextEdit("Información adicional sobre esta notificación.")
-        self.notification_additional_info.textChanged.connect(self.form_changed.emit)
+        self.notification_additional_info = QPlainTextEdit(DEFAULT_NOTIFICATION_ADDITIONAL_INFO)
         
-        self.notification_preferences_url = QLineEdit("https://miempresa.com/preferences")
-        self.notification_preferences_url.textChanged.connect(self.form_changed.emit)
+        self.notification_preferences_url = QLineEdit(DEFAULT_PREFERENCES_URL)
+        
+        # Conectar señales de cambio
+        self._wire_changed((
+            self.notification_title,
+            self.notification_message,
+            self.notification_type,
+            self.notification_icon,
+            self.notification_action_url,
+            self.notification_action_text,
+            self.notification_additional_info,
+            self.notification_preferences_url
+        ))
+        self._message_text = _TextCache(self.notification_message)
+        self._additional_info_text = _TextCache(self.notification_additional_info)
         
         notification_layout.addRow("Título:", self.notification_title)
         notification_layout.addRow("Mensaje:", self.notification_message)
@@ -384,39 +810,29 @@ class NotificationForm(QWidget):
         # Añadir espacio al final
         layout.addStretch()
     
-    def _manage_recipients(self):
-        """Abre diálogo para gestionar destinatarios."""
-        # En una implementación completa, aquí se abriría un diálogo
-        # para gestionar los destinatarios con nombres personalizados
-        logger.debug("Gestionar destinatarios (no implementado)")
-    
-    def get_form_data(self) -> Dict[str, Any]:
-        """Obtiene los datos del formulario."""
-        recipients = self.user_email.get_recipients()
-        emails = [email for email, _ in recipients]
-        names = [name for _, name in recipients]
+    def _build_form_data(self) -> Dict[str, Any]:
+        """Lee los datos del formulario de los widgets."""
+        self._ensure_ui()
+        notification: NotificationData = {
+            "title": self.notification_title.text(),
+            "message": self._message_text.get(),
+            "type": self.notification_type.currentText(),
+            "icon": self.notification_icon.text() or None,
+            "action_url": self.notification_action_url.text() or None,
+            "action_text": self.notification_action_text.text() or None,
+            "additional_info": self._additional_info_text.get() or None
+        }
         
         return {
-            "user": {
-                "names": names,
-                "emails": emails
-            },
-            "notification": {
-                "title": self.notification_title.text(),
-                "message": self.notification_message.toPlainText(),
-                "type": self.notification_type.currentText(),
-                "icon": self.notification_icon.text() or None,
-                "action_url": self.notification_action_url.text() or None,
-                "action_text": self.notification_action_text.text() or None,
-                "additional_info": self.notification_additional_info.toPlainText() or None
-            },
+            "user": self.user_block.get_user_data(),
+            "notification": notification,
             "query": {
                 "preferences_url": self.notification_preferences_url.text()
             }
         }
 
 
-class AlertForm(QWidget):
+class AlertForm(_LazyUiMixin, _ChangeDebounceMixin, QWidget):
     """Formulario para email de alerta."""
     
     # Señal que se emite cuando cambia cualquier campo
@@ -424,7 +840,7 @@ class AlertForm(QWidget):
     
     def __init__(self, parent=None):
         super().__init__(parent)
-        self._setup_ui()
+        self._init_change_timer()
     
     def _setup_ui(self):
         """Configura la interfaz de usuario."""
@@ -432,59 +848,47 @@ class AlertForm(QWidget):
         layout.setContentsMargins(0, 0, 0, 0)
         
         # Información del usuario
-        user_group = QGroupBox("Información del Usuario")
-        user_layout = QFormLayout(user_group)
-        
-        self.user_name = QLineEdit("Usuario de Prueba")
-        self.user_name.textChanged.connect(self.form_changed.emit)
-        
-        # Campo de emails
-        self.user_email_container = QWidget()
-        email_container_layout = QHBoxLayout(self.user_email_container)
-        email_container_layout.setContentsMargins(0, 0, 0, 0)
-        
-        self.user_email = RecipientsField("Ingrese un email por línea")
-        self.user_email.field_changed.connect(self.form_changed.emit)
-        self.user_email.set_emails(["usuario@ejemplo.com"])
-        
-        manage_recipients_button = QPushButton("Gestionar Destinatarios")
-        manage_recipients_button.clicked.connect(self._manage_recipients)
+        self.user_block = _UserBlock()
+        self.user_block.form_changed.connect(self._on_any_change)
+        self.user_block.content_changed.connect(self._invalidate_form_data)
+        self.user_name = self.user_block.user_name
+        self.user_email = self.user_block.user_email
         
-        email_container_layout.addWidget(self.user_email)
-        email_container_layout.addWidget(manage_recipients_button)
-        
-        user_layout.addRow("Nombre por defecto:", self.user_name)
-        user_layout.addRow("Email(s):", self.user_email_container)
-        
-        layout.addWidget(user_group)
+        layout.addWidget(self.user_block)
         
         # Contenido de la alerta
         alert_group = QGroupBox("Contenido de la Alerta")
         alert_layout = QFormLayout(alert_group)
         
-        self.alert_title = QLineEdit("Alerta de Seguridad")
-        self.alert_title.textChanged.connect(self.form_changed.emit)
+        self.alert_title = QLineEdit(DEFAULT_ALERT_TITLE)
         
-        self.alert_message = QTextEdit("Este es un mensaje de alerta de prueba.")
-        self.alert_message.textChanged.connect(self.form_changed.emit)
+        self.alert_message = QPlainTextEdit(DEFAULT_ALERT_MESSAGE)
         
         self.alert_type = QComboBox()
         self.alert_type.addItems(["info", "warning", "error"])
-        self.alert_type.currentIndexChanged.connect(self.form_changed.emit)
         
-        self.alert_steps = QTextEdit("Paso 1: Verificar conexión\nPaso 2: Actualizar contraseña\nPaso 3: Cerrar sesiones")
-        self.alert_steps.setPlaceholderText("Un paso por línea")
-        self.alert_steps.textChanged.connect(self.form_changed.emit)
+        self.alert_steps = QPlainTextEdit(DEFAULT_ALERT_STEPS)
+        self.alert_steps.setPlaceholderText(STEPS_PLACEHOLDER)
         
-        self.alert_action_url = QLineEdit("https://miempresa.com/action")
-        self.alert_action_url.textChanged.connect(self.form_changed.emit)
+        self.alert_action_url = QLineEdit(DEFAULT_ACTION_URL)
         
-        self.alert_action_text = QLineEdit("Resolver Ahora")
-        self.alert_action_text.textChanged.connect(self.form_changed.emit)
+        self.alert_action_text = QLineEdit(DEFAULT_ALERT_ACTION_TEXT)
         
         self.alert_contact_support = QCheckBox("Incluir información de soporte")
         self.alert_contact_support.setChecked(True)
-        self.alert_contact_support.stateChanged.connect(self.form_changed.emit)
+        
+        # Conectar señales de cambio
+        self._wire_changed((
+            self.alert_title,
+            self.alert_message,
+            self.alert_type,
+            self.alert_steps,
+            self.alert_action_url,
+            self.alert_action_text,
+            self.alert_contact_support
+        ))
+        self._alert_message_text = _TextCache(self.alert_message)
+        self._alert_steps = _TextCache(self.alert_steps, _parse_steps)
         
         alert_layout.addRow("Título:", self.alert_title)
         alert_layout.addRow("Mensaje:", self.alert_message)
@@ -499,51 +903,51 @@ class AlertForm(QWidget):
         # Añadir espacio al final
         layout.addStretch()
     
-    def _manage_recipients(self):
-        """Abre diálogo para gestionar destinatarios."""
-        # En una implementación completa, aquí se abriría un diálogo
-        # para gestionar los destinatarios con nombres personalizados
-        logger.debug("Gestionar destinatarios (no implementado)")
-    
-    def get_form_data(self) -> Dict[str, Any]:
-        """Obtiene los datos del formulario."""
-        recipients = self.user_email.get_recipients()
-        emails = [email for email, _ in recipients]
-        names = [name for _, name in recipients]
-        
-        # Obtener los pasos
-        steps = [
-            step.strip() 
-            for step in self.alert_steps.toPlainText().split("\n") 
-            if step.strip()
-        ]
+    def _build_form_data(self) -> Dict[str, Any]:
+        """Lee los datos del formulario de los widgets."""
+        self._ensure_ui()
+        alert: AlertData = {
+            "title": self.alert_title.text(),
+            "message": self._alert_message_text.get(),
+            "type": self.alert_type.currentText(),
+            "steps": self._alert_steps.get(),
+            "action_url": self.alert_action_url.text() or None,
+            "action_text": self.alert_action_text.text() or None,
+            "contact_support": self.alert_contact_support.isChecked()
+        }
         
         return {
-            "user": {
-                "names": names,
-                "emails": emails
-            },
-            "alert": {
-                "title": self.alert_title.text(),
-                "message": self.alert_message.toPlainText(),
-                "type": self.alert_type.currentText(),
-                "steps": steps if steps else None,
-                "action_url": self.alert_action_url.text() or None,
-                "action_text": self.alert_action_text.text() or None,
-                "contact_support": self.alert_contact_support.isChecked()
-            }
+            "user": self.user_block.get_user_data(),
+            "alert": alert
         }
 
 
-class BatchForm(QWidget):
+class BatchForm(_LazyUiMixin, _ChangeDebounceMixin, QWidget):
     """Formulario para envío en lote."""
     
+    # Tipos de email del lote, en el orden del combo y de los paneles de
+    # parámetros. El tipo se obtiene por índice, sin convertir el texto del
+    # combo, y se guarda cada vez que cambia la selección
+    _EMAIL_TYPES = ("welcome", "password-reset", "notification", "alert")
+    
     # Señal que se emite cuando cambia cualquier campo
     form_changed = pyqtSignal()
     
     def __init__(self, parent=None):
         super().__init__(parent)
-        self._setup_ui()
+        self._init_change_timer()
+        
+        # Datos sin destinatarios, guardados aparte porque no dependen de
+        # la lista de destinatarios
+        self._params_data: Optional[Dict[str, Any]] = None
+        
+        # Lectores de parámetros por tipo de email
+        self._param_readers: Dict[str, Callable[[], Dict[str, Any]]] = {
+            "welcome": self._welcome_data,
+            "password-reset": self._password_reset_data,
+            "notification": self._notification_data,
+            "alert": self._alert_data
+        }
     
     def _setup_ui(self):
         """Configura la interfaz de usuario."""
@@ -555,7 +959,7 @@ class BatchForm(QWidget):
         type_layout = QFormLayout(type_group)
         
         self.email_type = QComboBox()
-        self.email_type.addItems(["welcome", "password-reset", "notification", "alert"])
+        self.email_type.addItems(list(self._EMAIL_TYPES))
         self.email_type.currentIndexChanged.connect(self._update_params)
         
         type_layout.addRow("Tipo:", self.email_type)
@@ -567,9 +971,13 @@ class BatchForm(QWidget):
         recipients_layout = QVBoxLayout(recipients_group)
         
         # Editor de texto para los destinatarios
-        self.recipients_text = QTextEdit()
+        self.recipients_text = QPlainTextEdit()
         self.recipients_text.setPlaceholderText("usuario1@ejemplo.com, Nombre 1\nusuario2@ejemplo.com, Nombre 2\n...")
-        self.recipients_text.textChanged.connect(self.form_changed.emit)
+        self._recipients_highlighter = _RecipientHighlighter(self.recipients_text.document())
+        self._recipients = _TextCache(self.recipients_text, _parse_recipients)
+        
+        # Conectar señales de cambio
+        self.recipients_text.textChanged.connect(self._on_recipients_change)
         
         recipients_layout.addWidget(self.recipients_text)
         
@@ -588,10 +996,18 @@ class BatchForm(QWidget):
         
         layout.addWidget(recipients_group)
         
-        # Parámetros adicionales (depende del tipo de email)
-        self.params_container = QWidget()
-        self.params_layout = QVBoxLayout(self.params_container)
-        layout.addWidget(self.params_container)
+        # Parámetros adicionales (depende del tipo de email). Cada panel se
+        # construye la primera vez que se selecciona su tipo y después solo
+        # se cambia el panel visible
+        self.params_stack = QStackedWidget()
+        self._params_pages: Dict[int, QWidget] = {}
+        self._page_builders = (
+            self._build_welcome_params,
+            self._build_reset_params,
+            self._build_notification_params,
+            self._build_alert_params
+        )
+        layout.addWidget(self.params_stack)
         
         # Actualizar los parámetros según el tipo seleccionado
         self._update_params()
@@ -599,125 +1015,160 @@ class BatchForm(QWidget):
         # Añadir espacio al final
         layout.addStretch()
     
+    def _build_welcome_params(self) -> QWidget:
+        """Construye el panel de parámetros del email de bienvenida."""
+        params_group = QGroupBox("Parámetros de Bienvenida")
+        params_layout = QFormLayout(params_group)
+        
+        self.dashboard_url = QLineEdit(DEFAULT_DASHBOARD_URL)
+        params_layout.addRow("Dashboard URL:", self.dashboard_url)
+        
+        # Conectar señales de cambio
+        self._wire_changed((self.dashboard_url,))
+        
+        return params_group
+    
+    def _build_reset_params(self) -> QWidget:
+        """Construye el panel de parámetros del reset de contraseña."""
+        params_group = QGroupBox("Parámetros de Reset")
+        params_layout = QFormLayout(params_group)
+        
+        self.reset_url = QLineEdit(DEFAULT_RESET_URL)
+        params_layout.addRow("Reset URL:", self.reset_url)
+        
+        self.expires_in = QSpinBox()
+        self.expires_in.setValue(24)
+        self.expires_in.setRange(1, 72)
+        params_layout.addRow("Expira en (horas):", self.expires_in)
+        
+        # Conectar señales de cambio
+        self._wire_changed((
+            self.reset_url,
+            self.expires_in
+        ))
+        
+        return params_group
+    
+    def _build_notification_params(self) -> QWidget:
+        """Construye el panel de parámetros de la notificación."""
+        params_group = QGroupBox("Parámetros de Notificación")
+        params_layout = QFormLayout(params_group)
+        
+        self.notification_title = QLineEdit(DEFAULT_NOTIFICATION_TITLE)
+        params_layout.addRow("Título:", self.notification_title)
+        
+        self.notification_message = QPlainTextEdit(DEFAULT_NOTIFICATION_MESSAGE)
+        params_layout.addRow("Mensaje:", self.notification_message)
+        
+        self.notification_type = QComboBox()
+        self.notification_type.addItems(["success", "warning", "error", "info"])
+        params_layout.addRow("Tipo:", self.notification_type)
+        
+        self.notification_icon = QLineEdit(DEFAULT_NOTIFICATION_ICON)
+        params_layout.addRow("Icono URL:", self.notification_icon)
+        
+        self.notification_action_url = QLineEdit(DEFAULT_ACTION_URL)
+        params_layout.addRow("Action URL:", self.notification_action_url)
+        
+        self.notification_action_text = QLineEdit(DEFAULT_NOTIFICATION_ACTION_TEXT)
+        params_layout.addRow("Action Text:", self.notification_action_text)
+        
+        self.notification_additional_info = QPlainTextEdit(DEFAULT_NOTIFICATION_ADDITIONAL_INFO)
+        params_layout.addRow("Info Adicional:", self.notification_additional_info)
+        
+        self.notification_preferences_url = QLineEdit(DEFAULT_PREFERENCES_URL)
+        params_layout.addRow("Preferences URL:", self.notification_preferences_url)
+        
+        # Conectar señales de cambio
+        self._wire_changed((
+            self.notification_title,
+            self.notification_message,
+            self.notification_type,
+            self.notification_icon,
+            self.notification_action_url,
+            self.notification_action_text,
+            self.notification_additional_info,
+            self.notification_preferences_url
+        ))
+        self._message_text = _TextCache(self.notification_message)
+        self._additional_info_text = _TextCache(self.notification_additional_info)
+        
+        # Campos de la consulta: (clave, lector, None si está vacío)
+        self._notification_getters = (
+            ("title", self.notification_title.text, False),
+            ("message", self._message_text.get, False),
+            ("type", self.notification_type.currentText, False),
+            ("icon", self.notification_icon.text, True),
+            ("action_url", self.notification_action_url.text, True),
+            ("action_text", self.notification_action_text.text, True),
+            ("additional_info", self._additional_info_text.get, True),
+            ("preferences_url", self.notification_preferences_url.text, False)
+        )
+        
+        return params_group
+    
+    def _build_alert_params(self) -> QWidget:
+        """Construye el panel de parámetros de la alerta."""
+        params_group = QGroupBox("Parámetros de Alerta")
+        params_layout = QFormLayout(params_group)
+        
+        self.alert_title = QLineEdit(DEFAULT_ALERT_TITLE)
+        params_layout.addRow("Título:", self.alert_title)
+        
+        self.alert_message = QPlainTextEdit(DEFAULT_ALERT_MESSAGE)
+        params_layout.addRow("Mensaje:", self.alert_message)
+        
+        self.alert_type = QComboBox()
+        self.alert_type.addItems(["info", "warning", "error"])
+        params_layout.addRow("Tipo:", self.alert_type)
+        
+        self.alert_steps = QPlainTextEdit(DEFAULT_ALERT_STEPS)
+        self.alert_steps.setPlaceholderText(STEPS_PLACEHOLDER)
+        params_layout.addRow("Pasos:", self.alert_steps)
+        
+        self.alert_action_url = QLineEdit(DEFAULT_ACTION_URL)
+        params_layout.addRow("Action URL:", self.alert_action_url)
+        
+        self.alert_action_text = QLineEdit(DEFAULT_ALERT_ACTION_TEXT)
+        params_layout.addRow("Action Text:", self.alert_action_text)
+        
+        self.alert_contact_support = QCheckBox("Incluir información de soporte")
+        self.alert_contact_support.setChecked(True)
+        params_layout.addRow("", self.alert_contact_support)
+        
+        # Conectar señales de cambio
+        self._wire_changed((
+            self.alert_title,
+            self.alert_message,
+            self.alert_type,
+            self.alert_steps,
+            self.alert_action_url,
+            self.alert_action_text,
+            self.alert_contact_support
+        ))
+        self._alert_message_text = _TextCache(self.alert_message)
+        self._alert_steps = _TextCache(self.alert_steps, _parse_steps)
+        
+        return params_group
+    
+    def _params_page(self, index: int) -> QWidget:
+        """Obtiene el panel de parámetros de un tipo, construyéndolo si hace falta."""
+        page = self._params_pages.get(index)
+        if page is None:
+            page = self._page_builders[index]()
+            self.params_stack.addWidget(page)
+            self._params_pages[index] = page
+        return page
+    
     def _update_params(self):
-        """Actualiza los parámetros según el tipo de email seleccionado."""
-        # Limpiar el contenedor de parámetros
-        for i in reversed(range(self.params_layout.count())):
-            widget = self.params_layout.itemAt(i).widget()
-            if widget:
-                widget.setParent(None)
-        
-        # Obtener el tipo de email seleccionado
-        email_type = self.email_type.currentText()
-        
-        if email_type == "welcome":
-            # Parámetros para email de bienvenida
-            params_group = QGroupBox("Parámetros de Bienvenida")
-            params_layout = QFormLayout(params_group)
-            
-            self.dashboard_url = QLineEdit("https://miempresa.com/dashboard")
-            self.dashboard_url.textChanged.connect(self.form_changed.emit)
-            params_layout.addRow("Dashboard URL:", self.dashboard_url)
-            
-            self.params_layout.addWidget(params_group)
-            
-        elif email_type == "password-reset":
-            # Parámetros para reset de contraseña
-            params_group = QGroupBox("Parámetros de Reset")
-            params_layout = QFormLayout(params_group)
-            
-            self.reset_url = QLineEdit("https://miempresa.com/reset-password")
-            self.reset_url.textChanged.connect(self.form_changed.emit)
-            params_layout.addRow("Reset URL:", self.reset_url)
-            
-            self.expires_in = QSpinBox()
-            self.expires_in.setValue(24)
-            self.expires_in.setRange(1, 72)
-            self.expires_in.valueChanged.connect(self.form_changed.emit)
-            params_layout.addRow("Expira en (horas):", self.expires_in)
-            
-            self.params_layout.addWidget(params_group)
-            
-        elif email_type == "notification":
-            # Parámetros para notificación
-            params_group = QGroupBox("Parámetros de Notificación")
-            params_layout = QFormLayout(params_group)
-            
-            self.notification_title = QLineEdit("Notificación Importante")
-            self.notification_title.textChanged.connect(self.form_changed.emit)
-            params_layout.addRow("Título:", self.notification_title)
-            
-            self.notification_message = QTextEdit("Este es un mensaje de notificación de prueba.")
-            self.notification_message.textChanged.connect(self.form_changed.emit)
-            params_layout.addRow("Mensaje:", self.notification_message)
-            
-            self.notification_type = QComboBox()
-            self.notification_type.addItems(["success", "warning", "error", "info"])
-            self.notification_type.currentIndexChanged.connect(self.form_changed.emit)
-            params_layout.addRow("Tipo:", self.notification_type)
-            
-            self.notification_icon = QLineEdit("https://miempresa.com/icons/notification.png")
-            self.notification_icon.textChanged.connect(self.form_changed.emit)
-            params_layout.addRow("Icono URL:", self.notification_icon)
-            
-            self.notification_action_url = QLineEdit("https://miempresa.com/action")
-            self.notification_action_url.textChanged.connect(self.form_changed.emit)
-            params_layout.addRow("Action URL:", self.notification_action_url)
-            
-            self.notification_action_text = QLineEdit("Ver Detalles")
-            self.notification_action_text.textChanged.connect(self.form_changed.emit)
-            params_layout.addRow("Action Text:", self.notification_action_text)
-            
-            self.notification_additional_info = QTextEdit("Información adicional sobre esta notificación.")
-            self.notification_additional_info.textChanged.connect(self.form_changed.emit)
-            params_layout.addRow("Info Adicional:", self.notification_additional_info)
-            
-            self.notification_preferences_url = QLineEdit("https://miempresa.com/preferences")
-            self.notification_preferences_url.textChanged.connect(self.form_changed.emit)
-            params_layout.addRow("Preferences URL:", self.notification_preferences_url)
-            
-            self.params_layout.addWidget(params_group)
-            
-        elif email_type == "alert":
-            # Parámetros para alerta
-            params_group = QGroupBox("Parámetros de Alerta")
-            params_layout = QFormLayout(params_group)
-            
-            self.alert_title = QLineEdit("Alerta de Seguridad")
-            self.alert_title.textChanged.connect(self.form_changed.emit)
-            params_layout.addRow("Título:", self.alert_title)
-            
-            self.alert_message = QTextEdit("Este es un mensaje de alerta de prueba.")
-            self.alert_message.textChanged.connect(self.form_changed.emit)
-            params_layout.addRow("Mensaje:", self.alert_message)
-            
-            self.alert_type = QComboBox()
-            self.alert_type.addItems(["info", "warning", "error"])
-            self.alert_type.currentIndexChanged.connect(self.form_changed.emit)
-            params_layout.addRow("Tipo:", self.alert_type)
-            
-            self.alert_steps = QTextEdit("Paso 1: Verificar conexión\nPaso 2: Actualizar contraseña\nPaso 3: Cerrar sesiones")
-            self.alert_steps.setPlaceholderText("Un paso por línea")
-            self.alert_steps.textChanged.connect(self.form_changed.emit)
-            params_layout.addRow("Pasos:", self.alert_steps)
-            
-            self.alert_action_url = QLineEdit("https://miempresa.com/action")
-            self.alert_action_url.textChanged.connect(self.form_changed.emit)
-            params_layout.addRow("Action URL:", self.alert_action_url)
-            
-            self.alert_action_text = QLineEdit("Resolver Ahora")
-            self.alert_action_text.textChanged.connect(self.form_changed.emit)
-            params_layout.addRow("Action Text:", self.alert_action_text)
-            
-            self.alert_contact_support = QCheckBox("Incluir información de soporte")
-            self.alert_contact_support.setChecked(True)
-            self.alert_contact_support.stateChanged.connect(self.form_changed.emit)
-            params_layout.addRow("", self.alert_contact_support)
-            
-            self.params_layout.addWidget(params_group)
-        
-        # Emitir señal de cambio
-        self.form_changed.emit()
+        """Muestra el panel de parámetros del tipo de email seleccionado."""
+        index = self.email_type.currentIndex()
+        # Tipo actual guardado para leerlo sin consultar el combo
+        self._current_email_type = self._EMAIL_TYPES[index]
+        self.params_stack.setCurrentWidget(self._params_page(index))
+        
+        # Notificar el cambio a través del temporizador, como el resto de campos
+        self._on_any_change()
     
     def _manage_recipients(self):
         """Abre diálogo para gestionar destinatarios."""
@@ -725,83 +1176,127 @@ class BatchForm(QWidget):
         # para gestionar los destinatarios con nombres personalizados
         logger.debug("Gestionar destinatarios (no implementado)")
     
-    def get_recipients(self) -> List[Dict[str, str]]:
-        """Obtiene la lista de destinatarios como diccionarios."""
-        text = self.recipients_text.toPlainText()
-        recipients = []
-        
-        for line in text.split('\n'):
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Intentar separar por coma o punto y coma
-            if ',' in line:
-                parts = line.split(',', 1)
-            elif ';' in line:
-                parts = line.split(';', 1)
-            else:
-                # Solo email sin nombre
-                parts = [line, ""]
-            
-            email = parts[0].strip()
-            name = parts[1].strip() if len(parts) > 1 else ""
-            
-            if email:
-                recipients.append({
-                    "email": email,
-                    "name": name
-                })
-        
-        return recipients
+    def get_email_type(self) -> str:
+        """Obtiene el tipo de email seleccionado para el lote."""
+        self._ensure_ui()
+        return self._current_email_type
     
-    def get_form_data(self) -> Dict[str, Any]:
-        """Obtiene los datos del formulario."""
-        # Datos base
-        data = {
-            "email_type": self.email_type.currentText(),
-            "recipients": self.get_recipients()
-        }
-        
-        # Añadir parámetros según el tipo
-        email_type = self.email_type.currentText()
-        
-        if email_type == "welcome":
-            data["query"] = {
+    def get_recipients(self) -> List[Recipient]:
+        """
+        Obtiene la lista de destinatarios.
+        
+        La lista se reutiliza mientras no cambie el texto, por lo que no
+        debe modificarse.
+        """
+        self._ensure_ui()
+        # Solo se vuelve a analizar el texto si cambió desde la última llamada
+        return self._recipients.get()
+    
+    def get_first_recipient(self) -> Optional[Recipient]:
+        """
+        Obtiene el primer destinatario válido sin analizar el resto de la lista.
+        
+        Recorre las líneas del documento solo hasta encontrarlo, así que su
+        coste no depende del número de destinatarios (útil para la vista previa).
+        """
+        self._ensure_ui()
+        match = _EMAIL_RE.match
+        block = self.recipients_text.document().begin()
+        while block.isValid():
+            line = block.text().strip()
+            if line:
+                email, name = _split_recipient_line(line)
+                if match(email):
+                    return Recipient(email, name)
+            block = block.next()
+        return None
+    
+    def _welcome_data(self) -> Dict[str, Any]:
+        """Lee los parámetros del email de bienvenida."""
+        return {
+            "query": {
                 "dashboard_url": self.dashboard_url.text()
             }
-        elif email_type == "password-reset":
-            data["query"] = {
+        }
+    
+    def _password_reset_data(self) -> Dict[str, Any]:
+        """Lee los parámetros del reset de contraseña."""
+        return {
+            "query": {
                 "reset_url": self.reset_url.text(),
                 "expires_in": self.expires_in.value()
             }
-        elif email_type == "notification":
-            data["query"] = {
-                "title": self.notification_title.text(),
-                "message": self.notification_message.toPlainText(),
-                "type": self.notification_type.currentText(),
-                "icon": self.notification_icon.text() or None,
-                "action_url": self.notification_action_url.text() or None,
-                "action_text": self.notification_action_text.text() or None,
-                "additional_info": self.notification_additional_info.toPlainText() or None,
-                "preferences_url": self.notification_preferences_url.text()
-            }
-        elif email_type == "alert":
-            # Obtener los pasos
-            steps = [
-                step.strip() 
-                for step in self.alert_steps.toPlainText().split("\n") 
-                if step.strip()
-            ]
-            
-            data["alert"] = {
-                "title": self.alert_title.text(),
-                "message": self.alert_message.toPlainText(),
-                "type": self.alert_type.currentText(),
-                "steps": steps if steps else None,
-                "action_url": self.alert_action_url.text() or None,
-                "action_text": self.alert_action_text.text() or None,
-                "contact_support": self.alert_contact_support.isChecked()
-            }
+        }
+    
+    def _notification_data(self) -> Dict[str, Any]:
+        """Lee los parámetros de la notificación."""
+        query = {}
+        for key, getter, optional in self._notification_getters:
+            value = getter()
+            query[key] = None if optional and not value else value
+        
+        return {"query": cast(BatchNotificationData, query)}
+    
+    def _alert_data(self) -> Dict[str, Any]:
+        """Lee los parámetros de la alerta."""
+        alert: AlertData = {
+            "title": self.alert_title.text(),
+            "message": self._alert_message_text.get(),
+            "type": self.alert_type.currentText(),
+            "steps": self._alert_steps.get(),
+            "action_url": self.alert_action_url.text() or None,
+            "action_text": self.alert_action_text.text() or None,
+            "contact_support": self.alert_contact_support.isChecked()
+        }
+        return {"alert": alert}
+    
+    def _on_any_change(self):
+        """Registra un cambio en cualquier campo del formulario."""
+        self._params_data = None
+        super()._on_any_change()
+    
+    def _invalidate_form_data(self):
+        """Descarta los datos en caché sin notificar ningún cambio."""
+        self._params_data = None
+        super()._invalidate_form_data()
+    
+    def _on_recipients_change(self):
+        """
+        Registra un cambio en los destinatarios. Los datos sin destinatarios
+        siguen siendo válidos.
+        """
+        self._form_data = None
+        self._change_timer.start()
+    
+    def get_form_data(self, include_recipients: bool = True) -> Dict[str, Any]:
+        """
+        Obtiene los datos del formulario.
+        
+        Ambas variantes se reutilizan hasta el siguiente cambio que les
+        afecte, por lo que no deben modificarse.
+        
+        Args:
+            include_recipients: Si es False, se omite la clave "recipients" y
+                no se analiza el texto de destinatarios
+        """
+        if include_recipients:
+            return super().get_form_data()
+        if self._params_data is None:
+            self._params_data = self._build_form_data(include_recipients=False)
+        return self._params_data
+    
+    def _build_form_data(self, include_recipients: bool = True) -> Dict[str, Any]:
+        """Lee los datos del formulario de los widgets."""
+        email_type = self.get_email_type()
+        
+        # Datos base
+        data = {"email_type": email_type}
+        if include_recipients:
+            data["recipients"] = self.get_recipients()
+        
+        # Añadir parámetros según el tipo
+        read_params = self._param_readers.get(email_type)
+        if read_params is not None:
+            data.update(read_params())
         
         return data
\ No newline at end of file
@@ -1,35 +1,141 @@
 """
 Ventana principal de la aplicación.
 """
+import hashlib
 import logging
-import os
+from collections import OrderedDict
+from datetime import datetime
 from pathlib import Path
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from types import MappingProxyType
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+import orjson
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
-    QSplitter, QToolBar, QAction, QLineEdit, QLabel,
+    QSplitter, QLineEdit, QLabel,
     QFileDialog, QMessageBox, QPushButton, QFrame,
-    QStatusBar
+    QStatusBar, QStackedWidget
 )
-from PyQt5.QtCore import Qt, QTimer, pyqtSlot
-from PyQt5.QtGui import QIcon
+from PyQt5.QtCore import Qt, QThreadPool, QTimer
 
 from config import ClientConfig
 from components.sidebar import EmailTypesSidebar
-from components.preview import EmailPreviewPanel, RenderPreviewWorker
+from components.preview import (
+    EmailPreviewPanel, RenderPreviewSignals, RenderPreviewWorker,
+    TemplatePrewarmWorker
+)
 from components.forms import (
     CompanyForm, WelcomeEmailForm, PasswordResetForm, 
-    NotificationForm, AlertForm, BatchForm
+    NotificationForm, AlertForm, BatchForm,
+    DEFAULT_NOTIFICATION_TITLE, DEFAULT_NOTIFICATION_MESSAGE
 )
 from utils.api_client import EmailAPIClient, APIError
+from utils.api_worker import ApiCallSignals, ApiCallWorker
+
+if TYPE_CHECKING:
+    from jinja2 import Template
 
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=None)
+def _autoescape():
+    """Regla de autoescape de las plantillas, construida una sola vez."""
+    from jinja2 import select_autoescape
+    return select_autoescape(['html', 'xml'])
+
+
+# Año mostrado en el pie de las plantillas de la vista previa
+_CURRENT_YEAR = datetime.now().year
+
+# Tiempo (ms) sin cambios tras el que se actualiza la vista previa
+PREVIEW_UPDATE_DELAY_MS = 500
+
+# Número de vistas previas renderizadas que se conservan
+PREVIEW_HTML_CACHE_SIZE = 64
+
+
+def _context_digest(template_data) -> str:
+    """Huella estable del contexto de una plantilla, independiente del orden de las claves."""
+    payload = orjson.dumps(template_data, default=str, option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(payload, digest_size=8).hexdigest()
+
+# Ubicaciones donde se busca el directorio de plantillas si no se configura
+_CANDIDATE_TEMPLATE_DIRS = (
+    Path("./templates"),
+    Path("../templates"),
+    Path(__file__).parent.parent.parent.parent / "email_system" / "email_service" / "templates",
+)
+
+# Plantilla de cada tipo de email individual
+_EMAIL_TYPE_TO_TEMPLATE = MappingProxyType({
+    "welcome": "welcome.html",
+    "password_reset": "password_reset.html",
+    "notification": "notification.html",
+    "alert": "alert.html"
+})
+
+# Plantilla de cada tipo de email del formulario de lote
+_BATCH_TYPE_TO_TEMPLATE = MappingProxyType({
+    "welcome": "welcome.html",
+    "password-reset": "password_reset.html",
+    "notification": "notification.html",
+    "alert": "alert.html"
+})
+
+# Valores de la notificación en lote que no aparecen en la consulta
+_NOTIFICATION_DEFAULTS = MappingProxyType({
+    "title": DEFAULT_NOTIFICATION_TITLE,
+    "message": DEFAULT_NOTIFICATION_MESSAGE,
+    "type": "info",
+    "icon": None,
+    "action_url": None,
+    "action_text": None,
+    "additional_info": None
+})
+_NOTIFICATION_KEYS = frozenset(_NOTIFICATION_DEFAULTS)
+
+# Hojas de estilo de la ventana; cada widget las aplica una única vez
+_TOOLBAR_QSS = """
+    background-color: white;
+    border-bottom: 1px solid #e0e0e0;
+    max-height: 60px;
+"""
+
+_BROWSE_BTN_QSS = """
+    QPushButton {
+        background-color: #f5f5f5;
+        border: none;
+        border-radius: 4px;
+        padding: 8px 16px;
+    }
+    QPushButton:hover {
+        background-color: #e0e0e0;
+    }
+"""
+
+_SEND_BTN_QSS = """
+    QPushButton {
+        background-color: #4CAF50;
+        color: white;
+        padding: 8px 16px;
+        border-radius: 4px;
+        font-weight: bold;
+        min-width: 120px;
+    }
+    QPushButton:hover {
+        background-color: #45a049;
+    }
+"""
+
+
 class EmailTesterMainWindow(QMainWindow):
     """Ventana principal de la aplicación de prueba de emails."""
     
+    # Directorio de plantillas encontrado en la primera búsqueda
+    _discovered_templates_dir: Optional[Path] = None
+    
     def __init__(self, config: ClientConfig, parent=None):
         super().__init__(parent)
         self.config = config
@@ -40,8 +146,30 @@ class EmailTesterMainWindow(QMainWindow):
         
         # Atributos principales
         self.template_env = None
+        self._template_cache: Dict[str, "Template"] = {}
         self.current_email_type = None
-        self.preview_update_timer = None
+        self._browse_dialog = None
+        
+        # Temporizador único de actualización de la vista previa: cada cambio
+        # lo reinicia en lugar de crear uno nuevo
+        self.preview_update_timer = QTimer(self)
+        self.preview_update_timer.setSingleShot(True)
+        self.preview_update_timer.setInterval(PREVIEW_UPDATE_DELAY_MS)
+        self.preview_update_timer.timeout.connect(self._update_preview)
+        
+        # Renderizado de la vista previa en segundo plano. Solo se muestra el
+        # resultado del último renderizado lanzado
+        self._preview_epoch = 0
+        self._preview_contexts: Dict[tuple, tuple] = {}
+        
+        # HTML ya renderizado por (plantilla, huella del contexto), en orden LRU
+        self._html_cache: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._rendering_key: Optional[Tuple[str, str]] = None
+        self._render_signals = RenderPreviewSignals(self)
+        # Las señales se emiten desde el pool de hilos; la conexión en cola
+        # garantiza que los slots se ejecuten en el hilo de la interfaz
+        self._render_signals.preview_ready.connect(self._on_preview_ready, Qt.QueuedConnection)
+        self._render_signals.error.connect(self._on_preview_error, Qt.QueuedConnection)
         
         # Configurar la ventana
         self.setWindowTitle("Email System - Tester")
@@ -50,8 +178,8 @@ class EmailTesterMainWindow(QMainWindow):
         # Inicializar UI
         self._setup_ui()
         
-        # Configurar motor de plantillas
-        self._setup_template_engine()
+        # Configurar motor de plantillas cuando la ventana ya se muestra
+        QTimer.singleShot(0, self._setup_template_engine)
         
         # Verificar conectividad con la API
         self._check_api_connection()
@@ -134,11 +262,7 @@ class EmailTesterMainWindow(QMainWindow):
             layout: Layout donde se agregará la barra de herramientas
         """
         toolbar_container = QWidget()
-        toolbar_container.setStyleSheet("""
-            background-color: white;
-            border-bottom: 1px solid #e0e0e0;
-            max-height: 60px;
-        """)
+        toolbar_container.setStyleSheet(_TOOLBAR_QSS)
         toolbar_layout = QHBoxLayout(toolbar_container)
         toolbar_layout.setContentsMargins(15, 12, 15, 12)
         
@@ -177,17 +301,7 @@ class EmailTesterMainWindow(QMainWindow):
         toolbar_layout.addWidget(self.templates_dir_input)
         
         browse_button = QPushButton("Explorar")
-        browse_button.setStyleSheet("""
-            QPushButton {
-                background-color: #f5f5f5;
-                border: none;
-                border-radius: 4px;
-                padding: 8px 16px;
-            }
-            QPushButton:hover {
-                background-color: #e0e0e0;
-            }
-        """)
+        browse_button.setStyleSheet(_BROWSE_BTN_QSS)
         browse_button.clicked.connect(self._browse_templates_dir)
         toolbar_layout.addWidget(browse_button)
         
@@ -222,6 +336,58 @@ class EmailTesterMainWindow(QMainWindow):
         
         self.batch_form = BatchForm()
         self.batch_form.form_changed.connect(self._schedule_preview_update)
+        
+        # Formulario, datos de vista previa y envío de cada tipo de email
+        self._forms_by_type = {
+            "welcome": self.welcome_form,
+            "password_reset": self.password_reset_form,
+            "notification": self.notification_form,
+            "alert": self.alert_form,
+            "batch": self.batch_form
+        }
+        self._preview_data_getters = {
+            "welcome": self._get_welcome_template_data,
+            "password_reset": self._get_password_reset_template_data,
+            "notification": self._get_notification_template_data,
+            "alert": self._get_alert_template_data
+        }
+        self._batch_preview_data_getters = {
+            "welcome": self._get_batch_welcome_template_data,
+            "password-reset": self._get_batch_password_reset_template_data,
+            "notification": self._get_batch_notification_template_data,
+            "alert": self._get_batch_alert_template_data
+        }
+        self._senders = {
+            "welcome": self._send_welcome_email,
+            "password_reset": self._send_password_reset,
+            "notification": self._send_notification,
+            "alert": self._send_alert,
+            "batch": self._send_batch_email
+        }
+        
+        # Cada formulario específico es una página de la pila; el formulario
+        # de empresa y los botones de acción quedan fuera y no se recrean
+        self.forms_stack = QStackedWidget()
+        self._email_type_to_index = {}
+        for email_type, form in self._forms_by_type.items():
+            self._email_type_to_index[email_type] = self.forms_stack.addWidget(form)
+        
+        # Botones de acción
+        action_buttons = QWidget()
+        action_layout = QHBoxLayout(action_buttons)
+        
+        # Añadir espacio
+        action_layout.addStretch()
+        
+        # Botón para enviar email
+        self.send_btn = QPushButton("Enviar Email")
+        self.send_btn.clicked.connect(self._send_email)
+        self.send_btn.setStyleSheet(_SEND_BTN_QSS)
+        action_layout.addWidget(self.send_btn)
+        
+        self.form_layout.addWidget(self.company_form)
+        self.form_layout.addWidget(self.forms_stack)
+        self.form_layout.addWidget(action_buttons)
     
     def _on_email_type_changed(self, email_type):
         """
@@ -241,58 +407,9 @@ class EmailTesterMainWindow(QMainWindow):
         Args:
             email_type (str): Tipo de email
         """
-        # Limpiar el contenedor de formularios
-        for i in reversed(range(self.form_layout.count())):
-            widget = self.form_layout.itemAt(i).widget()
-            if widget:
-                widget.setParent(None)
-        
-        # Añadir el formulario de empresa (común a todos)
-        self.form_layout.addWidget(self.company_form)
-        
-        # Añadir el formulario específico
-        specific_form = None
-        
-        if email_type == "welcome":
-            specific_form = self.welcome_form
-        elif email_type == "password_reset":
-            specific_form = self.password_reset_form
-        elif email_type == "notification":
-            specific_form = self.notification_form
-        elif email_type == "alert":
-            specific_form = self.alert_form
-        elif email_type == "batch":
-            specific_form = self.batch_form
-        
-        if specific_form:
-            self.form_layout.addWidget(specific_form)
-        
-        # Botones de acción
-        action_buttons = QWidget()
-        action_layout = QHBoxLayout(action_buttons)
-        
-        # Añadir espacio
-        action_layout.addStretch()
-        
-        # Botón para enviar email
-        send_btn = QPushButton("Enviar Email")
-        send_btn.clicked.connect(self._send_email)
-        send_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #4CAF50;
-                color: white;
-                padding: 8px 16px;
-                border-radius: 4px;
-                font-weight: bold;
-                min-width: 120px;
-            }
-            QPushButton:hover {
-                background-color: #45a049;
-            }
-        """)
-        action_layout.addWidget(send_btn)
-        
-        self.form_layout.addWidget(action_buttons)
+        index = self._email_type_to_index.get(email_type)
+        if index is not None:
+            self.forms_stack.setCurrentIndex(index)
     
     def _on_api_key_changed(self, api_key):
         """
@@ -306,9 +423,21 @@ class EmailTesterMainWindow(QMainWindow):
     
     def _browse_templates_dir(self):
         """Abre un diálogo para seleccionar el directorio de plantillas."""
-        directory = QFileDialog.getExistingDirectory(
-            self, "Seleccionar Directorio de Plantillas"
-        )
+        # El diálogo se crea en el primer uso y se reutiliza después
+        if self._browse_dialog is None:
+            self._browse_dialog = QFileDialog(self, "Seleccionar Directorio de Plantillas")
+            self._browse_dialog.setFileMode(QFileDialog.Directory)
+            self._browse_dialog.setOption(QFileDialog.ShowDirsOnly, True)
+            self._browse_dialog.setOption(QFileDialog.DontUseNativeDialog, True)
+        
+        if self.config.templates_dir:
+            self._browse_dialog.setDirectory(str(self.config.templates_dir))
+        
+        if not self._browse_dialog.exec_():
+            return
+        
+        selected = self._browse_dialog.selectedFiles()
+        directory = selected[0] if selected else None
         if directory:
             self.templates_dir_input.setText(directory)
             self.config.templates_dir = Path(directory)
@@ -322,6 +451,9 @@ class EmailTesterMainWindow(QMainWindow):
         Args:
             custom_dir (str, optional): Directorio personalizado de plantillas
         """
+        # Jinja2 se importa al configurar el motor, fuera del arranque
+        from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+        
         try:
             # Si se proporciona un directorio personalizado, usarlo
             if custom_dir:
@@ -331,63 +463,111 @@ class EmailTesterMainWindow(QMainWindow):
                 templates_dir = self.config.templates_dir
             # Si no hay directorio en la configuración, buscar en posibles ubicaciones
             else:
-                possible_paths = [
-                    Path("./templates"),
-                    Path("../templates"),
-                    Path(__file__).parent.parent.parent.parent / "email_system" / "email_service" / "templates",
-                ]
-                
-                templates_dir = None
-                for path in possible_paths:
-                    if path.exists() and path.is_dir():
-                        templates_dir = path
-                        self.templates_dir_input.setText(str(templates_dir))
-                        self.config.templates_dir = templates_dir
-                        break
+                templates_dir = self._discover_templates_dir()
                 
                 # Si no se encuentra un directorio, mostrar error
                 if templates_dir is None:
                     logger.warning("No se encontró un directorio de plantillas válido")
                     self._show_error_message("No se encontró un directorio de plantillas válido")
                     return
+                
+                self.templates_dir_input.setText(str(templates_dir))
+                self.config.templates_dir = templates_dir
+            
+            # Caché de bytecode: las plantillas ya compiladas en ejecuciones
+            # anteriores no se vuelven a analizar ni compilar. Sin directorio,
+            # Jinja2 usa uno propio del usuario con permisos 0700 y comprueba
+            # que nadie más lo controle antes de cargar el bytecode
+            bytecode_cache = FileSystemBytecodeCache()
             
             # Configurar el motor de plantillas
             self.template_env = Environment(
                 loader=FileSystemLoader(templates_dir),
-                autoescape=select_autoescape(['html', 'xml']),
+                autoescape=_autoescape(),
                 trim_blocks=True,
-                lstrip_blocks=True
+                lstrip_blocks=True,
+                bytecode_cache=bytecode_cache,
+                # Las plantillas resueltas se guardan en _template_cache, así
+                # que no se comprueba su fecha en disco en cada carga
+                auto_reload=False,
+                cache_size=400
             )
+            # Las plantillas resueltas y el HTML renderizado pertenecían al
+            # entorno anterior
+            self._template_cache.clear()
+            self._html_cache.clear()
+            self.preview_panel.set_base_dir(templates_dir)
+            
+            # Compilar las plantillas conocidas en segundo plano para que la
+            # primera vista previa no tenga que hacerlo
+            QThreadPool.globalInstance().start(TemplatePrewarmWorker(
+                self.template_env,
+                set(_EMAIL_TYPE_TO_TEMPLATE.values())
+            ))
             logger.info(f"Motor de plantillas configurado con el directorio: {templates_dir}")
             
         except Exception as e:
             logger.error(f"Error al configurar el motor de plantillas: {str(e)}")
             self._show_error_message(f"Error al configurar el motor de plantillas: {str(e)}")
     
+    @classmethod
+    def _discover_templates_dir(cls) -> Optional[Path]:
+        """
+        Busca el directorio de plantillas entre las ubicaciones candidatas.
+        
+        El primer directorio encontrado se recuerda en la clase para no
+        volver a consultar el sistema de archivos.
+        """
+        if cls._discovered_templates_dir is None:
+            for path in _CANDIDATE_TEMPLATE_DIRS:
+                if path.is_dir():
+                    cls._discovered_templates_dir = path
+                    break
+        return cls._discovered_templates_dir
+    
     def _check_api_connection(self):
-        """Verifica la conexión con la API."""
-        try:
-            result = self.api_client.check_health()
-            logger.info(f"Conexión con la API establecida: {result}")
-            self.status_bar.showMessage(f"API conectada - Versión: {result.get('version', 'desconocida')}")
-        except APIError as e:
-            logger.error(f"Error al conectar con la API: {str(e)}")
-            self.status_bar.showMessage(f"Error al conectar con la API: {str(e)}")
-        except Exception as e:
-            logger.error(f"Error inesperado al verificar conexión: {str(e)}")
-            self.status_bar.showMessage(f"Error inesperado al verificar conexión: {str(e)}")
+        """Verifica la conexión con la API sin bloquear la interfaz."""
+        self._run_api_call(
+            self.api_client.check_health,
+            self._on_health_checked,
+            self._on_health_check_failed
+        )
+    
+    def _on_health_checked(self, result):
+        """Muestra el estado de la API cuando responde."""
+        logger.info(f"Conexión con la API establecida: {result}")
+        self.status_bar.showMessage(f"API conectada - Versión: {result.get('version', 'desconocida')}")
+    
+    def _on_health_check_failed(self, error):
+        """Muestra el error de la verificación de conexión."""
+        if isinstance(error, APIError):
+            logger.error(f"Error al conectar con la API: {str(error)}")
+            self.status_bar.showMessage(f"Error al conectar con la API: {str(error)}")
+        else:
+            logger.error(f"Error inesperado al verificar conexión: {str(error)}")
+            self.status_bar.showMessage(f"Error inesperado al verificar conexión: {str(error)}")
+    
+    def _run_api_call(self, call, on_finished, on_failed):
+        """
+        Ejecuta una llamada a la API en el pool de hilos.
+        
+        Args:
+            call (callable): Función sin argumentos que realiza la petición
+            on_finished (callable): Recibe el resultado en el hilo de la interfaz
+            on_failed (callable): Recibe la excepción en el hilo de la interfaz
+        """
+        # Las señales pertenecen a la ventana hasta que se entrega el resultado
+        signals = ApiCallSignals(self)
+        signals.finished.connect(on_finished)
+        signals.failed.connect(on_failed)
+        signals.finished.connect(signals.deleteLater)
+        signals.failed.connect(signals.deleteLater)
+        QThreadPool.globalInstance().start(ApiCallWorker(call, signals))
     
     def _schedule_preview_update(self):
         """Programa una actualización de la vista previa después de un retraso."""
-        # Cancelar el temporizador anterior si existe
-        if self.preview_update_timer:
-            self.preview_update_timer.stop()
-        
-        # Crear nuevo temporizador para actualizar después de 500ms
-        self.preview_update_timer = QTimer()
-        self.preview_update_timer.setSingleShot(True)
-        self.preview_update_timer.timeout.connect(self._update_preview)
-        self.preview_update_timer.start(500)
+        # start() reinicia la cuenta si el temporizador ya estaba activo
+        self.preview_update_timer.start()
     
     def _update_preview(self):
         """Actualiza la vista previa del email."""
@@ -395,55 +575,114 @@ class EmailTesterMainWindow(QMainWindow):
             return
         
         try:
-            # Determinar la plantilla según el tipo de email actual
-            if self.current_email_type == "welcome":
-                template_name = "welcome.html"
-                template_data = self._get_welcome_template_data()
-            elif self.current_email_type == "password_reset":
-                template_name = "password_reset.html"
-                template_data = self._get_password_reset_template_data()
-            elif self.current_email_type == "notification":
-                template_name = "notification.html"
-                template_data = self._get_notification_template_data()
-            elif self.current_email_type == "alert":
-                template_name = "alert.html"
-                template_data = self._get_alert_template_data()
-            elif self.current_email_type == "batch":
+            # Obtener la plantilla y los datos según el tipo de email actual
+            if self.current_email_type == "batch":
                 # Para batch, usamos el tipo seleccionado en el formulario
-                email_type = self.batch_form.email_type.currentText()
-                
-                if email_type == "welcome":
-                    template_name = "welcome.html"
-                    template_data = self._get_batch_welcome_template_data()
-                elif email_type == "password-reset":
-                    template_name = "password_reset.html"
-                    template_data = self._get_batch_password_reset_template_data()
-                elif email_type == "notification":
-                    template_name = "notification.html"
-                    template_data = self._get_batch_notification_template_data()
-                elif email_type == "alert":
-                    template_name = "alert.html"
-                    template_data = self._get_batch_alert_template_data()
-                else:
-                    self.preview_panel.clear_preview()
-                    self._show_error_message("Tipo de email no válido para el lote")
-                    return
+                email_type = self.batch_form.get_email_type()
+                template_name = _BATCH_TYPE_TO_TEMPLATE.get(email_type)
+                get_template_data = self._batch_preview_data_getters.get(email_type)
+                invalid_type_message = "Tipo de email no válido para el lote"
             else:
+                template_name = _EMAIL_TYPE_TO_TEMPLATE.get(self.current_email_type)
+                get_template_data = self._preview_data_getters.get(self.current_email_type)
+                invalid_type_message = "Tipo de email no válido"
+            
+            if get_template_data is None:
                 self.preview_panel.clear_preview()
-                self._show_error_message("Tipo de email no válido")
+                self._show_error_message(invalid_type_message)
                 return
             
-            # Renderizar la plantilla
-            # En una implementación real, esto se haría en un hilo separado
-            worker = RenderPreviewWorker(self.template_env, template_name, template_data)
-            worker.on_preview_ready = self.preview_panel.set_html_content
-            worker.on_error = self._show_error_message
-            worker.run()
+            template_data = self._get_preview_context(template_name, get_template_data)
+            
+            # Cualquier renderizado en curso queda obsoleto
+            self._preview_epoch += 1
+            
+            # Si este contexto ya se renderizó, no hace falta volver a hacerlo
+            key = (template_name, _context_digest(template_data))
+            html = self._html_cache.get(key)
+            if html is not None:
+                self._html_cache.move_to_end(key)
+                self.preview_panel.set_html_content(html)
+                return
+            
+            # Renderizar la plantilla en el pool de hilos
+            self._rendering_key = key
+            worker = RenderPreviewWorker(
+                self._get_template(template_name),
+                template_data,
+                self._preview_epoch,
+                self._render_signals
+            )
+            QThreadPool.globalInstance().start(worker)
             
         except Exception as e:
             logger.error(f"Error al actualizar la vista previa: {str(e)}")
             self._show_error_message(f"Error al actualizar la vista previa: {str(e)}")
     
+    def _get_preview_context(self, template_name: str, get_template_data):
+        """
+        Obtiene el contexto de la vista previa, reutilizando el anterior si
+        los datos de los que se construye no han cambiado.
+        
+        Los formularios devuelven el mismo objeto mientras no se editan, y la
+        comparación de tuplas comprueba la identidad antes que la igualdad,
+        así que normalmente no se recorren los datos. El contexto nunca se
+        modifica en el sitio porque puede estar renderizándose en el pool de
+        hilos.
+        
+        Args:
+            template_name (str): Nombre de la plantilla
+            get_template_data (callable): Constructor del contexto
+        """
+        company_data = self.company_form.get_company_data()
+        if self.current_email_type == "batch":
+            # La vista previa del lote solo usa el primer destinatario
+            sources = (
+                self.batch_form.get_form_data(include_recipients=False),
+                self.batch_form.get_first_recipient(),
+                company_data
+            )
+        else:
+            sources = (
+                self._forms_by_type[self.current_email_type].get_form_data(),
+                company_data
+            )
+        
+        key = (self.current_email_type, template_name)
+        cached = self._preview_contexts.get(key)
+        if cached is not None and cached[0] == sources:
+            return cached[1]
+        
+        template_data = get_template_data()
+        self._preview_contexts[key] = (sources, template_data)
+        return template_data
+    
+    def _on_preview_ready(self, epoch: int, html: str):
+        """Muestra una vista previa renderizada si es la más reciente."""
+        if epoch == self._preview_epoch:
+            self._html_cache[self._rendering_key] = html
+            if len(self._html_cache) > PREVIEW_HTML_CACHE_SIZE:
+                self._html_cache.popitem(last=False)
+            self.preview_panel.set_html_content(html)
+    
+    def _on_preview_error(self, epoch: int, message: str):
+        """Muestra el error de un renderizado si es el más reciente."""
+        if epoch == self._preview_epoch:
+            self._show_error_message(message)
+    
+    def _get_template(self, template_name: str) -> "Template":
+        """
+        Obtiene una plantilla del entorno actual, resolviéndola una sola vez.
+        
+        Args:
+            template_name (str): Nombre de la plantilla
+        """
+        template = self._template_cache.get(template_name)
+        if template is None:
+            template = self.template_env.get_template(template_name)
+            self._template_cache[template_name] = template
+        return template
+    
     def _show_error_message(self, message):
         """
         Muestra un mensaje de error.
@@ -467,57 +706,89 @@ class EmailTesterMainWindow(QMainWindow):
             company_data = self.company_form.get_company_data()
             
             # Enviar según el tipo
-            if self.current_email_type == "welcome":
-                self._send_welcome_email(company_data)
-            elif self.current_email_type == "password_reset":
-                self._send_password_reset(company_data)
-            elif self.current_email_type == "notification":
-                self._send_notification(company_data)
-            elif self.current_email_type == "alert":
-                self._send_alert(company_data)
-            elif self.current_email_type == "batch":
-                self._send_batch_email(company_data)
-            else:
+            send = self._senders.get(self.current_email_type)
+            if send is None:
                 raise ValueError(f"Tipo de email no soportado: {self.current_email_type}")
+            send(company_data)
             
-        except APIError as e:
-            self._show_error_message(f"Error al enviar email: {e.detail} (código: {e.status_code})")
         except Exception as e:
-            self._show_error_message(f"Error al enviar email: {str(e)}")
+            self._on_send_failed(e)
     
-    def _send_welcome_email(self, company_data):
+    def _start_send(self, call, title, describe_result):
         """
-        Envía un email de bienvenida.
+        Lanza un envío en segundo plano. El botón de envío queda
+        deshabilitado hasta que la API responde.
         
         Args:
-            company_data (dict): Datos de la empresa
+            call (callable): Función sin argumentos que realiza el envío
+            title (str): Título del mensaje de confirmación
+            describe_result (callable): Construye el mensaje a partir de la respuesta
         """
-        form_data = self.welcome_form.get_form_data()
+        def on_sent(result):
+            self._finish_send()
+            QMessageBox.information(self, title, describe_result(result))
         
-        # Preparar datos de usuario
-        user_data = {
-            "email": form_data["user"]["emails"][0],
-            "name": form_data["user"]["names"][0] if form_data["user"]["names"] else None
-        }
+        self.send_btn.setEnabled(False)
+        self.status_bar.showMessage("Enviando...")
+        self._run_api_call(call, on_sent, self._on_send_failed)
+    
+    def _finish_send(self):
+        """Rehabilita el envío cuando termina una petición."""
+        self.send_btn.setEnabled(True)
+        self.status_bar.clearMessage()
+    
+    def _on_send_failed(self, error):
+        """
+        Muestra el error de un envío.
+        
+        Args:
+            error (Exception): Excepción producida
+        """
+        self._finish_send()
+        if isinstance(error, APIError):
+            self._show_error_message(f"Error al enviar email: {error.detail} (código: {error.status_code})")
+        else:
+            self._show_error_message(f"Error al enviar email: {str(error)}")
+    
+    def _build_user_data(self, user_block):
+        """
+        Construye los datos de usuario de un envío individual.
         
+        Args:
+            user_block (dict): Bloque "user" de los datos del formulario
+        """
         # Si hay múltiples destinatarios, usar formato para múltiples
-        if len(form_data["user"]["emails"]) > 1:
-            user_data = {
-                "emails": form_data["user"]["emails"],
-                "names": form_data["user"]["names"]
+        if len(user_block["emails"]) > 1:
+            return {
+                "emails": user_block["emails"],
+                "names": user_block["names"]
             }
+        return {
+            "email": user_block["emails"][0],
+            "name": user_block["names"][0] if user_block["names"] else None
+        }
+    
+    def _send_welcome_email(self, company_data):
+        """
+        Envía un email de bienvenida.
         
-        # Enviar el email
-        result = self.api_client.send_welcome_email(
-            company=company_data,
-            user=user_data,
-            dashboard_url=form_data["query"]["dashboard_url"]
-        )
+        Args:
+            company_data (dict): Datos de la empresa
+        """
+        form_data = self.welcome_form.get_form_data()
         
-        QMessageBox.information(
-            self, 
-            "Email Enviado", 
-            f"El email de bienvenida se ha enviado correctamente. ID: {result.get('message_id')}"
+        # Preparar datos de usuario
+        user_data = self._build_user_data(form_data["user"])
+        
+        # Enviar el email en segundo plano
+        self._start_send(
+            lambda: self.api_client.send_welcome_email(
+                company=company_data,
+                user=user_data,
+                dashboard_url=form_data["query"]["dashboard_url"]
+            ),
+            "Email Enviado",
+            lambda result: f"El email de bienvenida se ha enviado correctamente. ID: {result.get('message_id')}"
         )
     
     def _send_password_reset(self, company_data):
@@ -530,30 +801,18 @@ class EmailTesterMainWindow(QMainWindow):
         form_data = self.password_reset_form.get_form_data()
         
         # Preparar datos de usuario
-        user_data = {
-            "email": form_data["user"]["emails"][0],
-            "name": form_data["user"]["names"][0] if form_data["user"]["names"] else None
-        }
-        
-        # Si hay múltiples destinatarios, usar formato para múltiples
-        if len(form_data["user"]["emails"]) > 1:
-            user_data = {
-                "emails": form_data["user"]["emails"],
-                "names": form_data["user"]["names"]
-            }
-        
-        # Enviar el email
-        result = self.api_client.send_password_reset(
-            company=company_data,
-            user=user_data,
-            reset_url=form_data["query"]["reset_url"],
-            expires_in=form_data["query"]["expires_in"]
-        )
-        
-        QMessageBox.information(
-            self, 
-            "Email Enviado", 
-            f"El email de restablecimiento de contraseña se ha enviado correctamente. ID: {result.get('message_id')}"
+        user_data = self._build_user_data(form_data["user"])
+        
+        # Enviar el email en segundo plano
+        self._start_send(
+            lambda: self.api_client.send_password_reset(
+                company=company_data,
+                user=user_data,
+                reset_url=form_data["query"]["reset_url"],
+                expires_in=form_data["query"]["expires_in"]
+            ),
+            "Email Enviado",
+            lambda result: f"El email de restablecimiento de contraseña se ha enviado correctamente. ID: {result.get('message_id')}"
         )
     
     def _send_notification(self, company_data):
@@ -566,30 +825,18 @@ class EmailTesterMainWindow(QMainWindow):
         form_data = self.notification_form.get_form_data()
         
         # Preparar datos de usuario
-        user_data = {
-            "email": form_data["user"]["emails"][0],
-            "name": form_data["user"]["names"][0] if form_data["user"]["names"] else None
-        }
-        
-        # Si hay múltiples destinatarios, usar formato para múltiples
-        if len(form_data["user"]["emails"]) > 1:
-            user_data = {
-                "emails": form_data["user"]["emails"],
-                "names": form_data["user"]["names"]
-            }
-        
-        # Enviar el email
-        result = self.api_client.send_notification(
-            company=company_data,
-            user=user_data,
-            notification=form_data["notification"],
-            preferences_url=form_data["query"]["preferences_url"]
-        )
-        
-        QMessageBox.information(
-            self, 
-            "Email Enviado", 
-            f"El email de notificación se ha enviado correctamente. ID: {result.get('message_id')}"
+        user_data = self._build_user_data(form_data["user"])
+        
+        # Enviar el email en segundo plano
+        self._start_send(
+            lambda: self.api_client.send_notification(
+                company=company_data,
+                user=user_data,
+                notification=form_data["notification"],
+                preferences_url=form_data["query"]["preferences_url"]
+            ),
+            "Email Enviado",
+            lambda result: f"El email de notificación se ha enviado correctamente. ID: {result.get('message_id')}"
         )
     
     def _send_alert(self, company_data):
@@ -602,29 +849,17 @@ class EmailTesterMainWindow(QMainWindow):
         form_data = self.alert_form.get_form_data()
         
         # Preparar datos de usuario
-        user_data = {
-            "email": form_data["user"]["emails"][0],
-            "name": form_data["user"]["names"][0] if form_data["user"]["names"] else None
-        }
-        
-        # Si hay múltiples destinatarios, usar formato para múltiples
-        if len(form_data["user"]["emails"]) > 1:
-            user_data = {
-                "emails": form_data["user"]["emails"],
-                "names": form_data["user"]["names"]
-            }
-        
-        # Enviar el email
-        result = self.api_client.send_alert(
-            company=company_data,
-            user=user_data,
-            alert=form_data["alert"]
-        )
-        
-        QMessageBox.information(
-            self, 
-            "Email Enviado", 
-            f"El email de alerta se ha enviado correctamente. ID: {result.get('message_id')}"
+        user_data = self._build_user_data(form_data["user"])
+        
+        # Enviar el email en segundo plano
+        self._start_send(
+            lambda: self.api_client.send_alert(
+                company=company_data,
+                user=user_data,
+                alert=form_data["alert"]
+            ),
+            "Email Enviado",
+            lambda result: f"El email de alerta se ha enviado correctamente. ID: {result.get('message_id')}"
         )
     
     def _send_batch_email(self, company_data):
@@ -640,21 +875,21 @@ class EmailTesterMainWindow(QMainWindow):
         if not form_data["recipients"]:
             raise ValueError("No se han proporcionado destinatarios")
         
-        # Enviar el email en lote
-        result = self.api_client.send_batch_email(
-            email_type=form_data["email_type"],
-            company=company_data,
-            recipients=form_data["recipients"],
-            query=form_data.get("query"),
-            alert=form_data.get("alert")
-        )
-        
-        QMessageBox.information(
-            self, 
-            "Emails Enviados", 
-            f"Se han enviado {result.get('sent', 0)} emails correctamente.\n"
-            f"Fallaron {result.get('failed', 0)} envíos.\n"
-            f"Total: {result.get('total', 0)} emails."
+        # Enviar el email en lote en segundo plano
+        self._start_send(
+            lambda: self.api_client.send_batch_email(
+                email_type=form_data["email_type"],
+                company=company_data,
+                recipients=[recipient._asdict() for recipient in form_data["recipients"]],
+                query=form_data.get("query"),
+                alert=form_data.get("alert")
+            ),
+            "Emails Enviados",
+            lambda result: (
+                f"Se han enviado {result.get('sent', 0)} emails correctamente.\n"
+                f"Fallaron {result.get('failed', 0)} envíos.\n"
+                f"Total: {result.get('total', 0)} emails."
+            )
         )
     
     # Métodos para obtener datos de plantillas (utilizados para la vista previa)
@@ -675,7 +910,7 @@ class EmailTesterMainWindow(QMainWindow):
                 "email": email
             },
             "dashboard_url": form_data["query"]["dashboard_url"],
-            "year": 2025
+            "year": _CURRENT_YEAR
         }
     
     def _get_password_reset_template_data(self):
@@ -695,7 +930,7 @@ class EmailTesterMainWindow(QMainWindow):
             },
             "reset_url": form_data["query"]["reset_url"],
             "expires_in": form_data["query"]["expires_in"],
-            "year": 2025
+            "year": _CURRENT_YEAR
         }
     
     def _get_notification_template_data(self):
@@ -715,7 +950,7 @@ class EmailTesterMainWindow(QMainWindow):
             },
             "notification": form_data["notification"],
             "preferences_url": form_data["query"]["preferences_url"],
-            "year": 2025
+            "year": _CURRENT_YEAR
         }
     
     def _get_alert_template_data(self):
@@ -734,115 +969,73 @@ class EmailTesterMainWindow(QMainWindow):
                 "email": email
             },
             "alert": form_data["alert"],
-            "year": 2025
+            "year": _CURRENT_YEAR
         }
     
-    def _get_batch_welcome_template_data(self):
-        """Obtiene los datos para la plantilla de bienvenida en lote."""
-        form_data = self.batch_form.get_form_data()
-        company_data = self.company_form.get_company_data()
+    def _common_batch_ctx(self):
+        """
+        Construye la parte del contexto común a las vistas previas en lote.
+        
+        Returns:
+            tuple: Contexto nuevo (empresa, usuario y año) y datos del
+                formulario sin destinatarios
+        """
+        form_data = self.batch_form.get_form_data(include_recipients=False)
         
         # Usar el primer destinatario para la vista previa
-        if form_data["recipients"]:
-            recipient = form_data["recipients"][0]
-            email = recipient["email"]
-            name = recipient["name"] or "Usuario"
+        recipient = self.batch_form.get_first_recipient()
+        if recipient is not None:
+            email = recipient.email
+            name = recipient.name or "Usuario"
         else:
             email = "usuario@ejemplo.com"
             name = "Usuario de Prueba"
         
-        query = form_data.get("query", {})
-        
-        return {
-            "company": company_data,
+        ctx = {
+            "company": self.company_form.get_company_data(),
             "user": {
                 "name": name,
                 "email": email
             },
-            "dashboard_url": query.get("dashboard_url", "https://miempresa.com/dashboard"),
-            "year": 2025
+            "year": _CURRENT_YEAR
         }
+        return ctx, form_data
+    
+    def _get_batch_welcome_template_data(self):
+        """Obtiene los datos para la plantilla de bienvenida en lote."""
+        ctx, form_data = self._common_batch_ctx()
+        query = form_data.get("query", {})
+        
+        ctx["dashboard_url"] = query.get("dashboard_url", "https://miempresa.com/dashboard")
+        return ctx
     
     def _get_batch_password_reset_template_data(self):
         """Obtiene los datos para la plantilla de reset en lote."""
-        form_data = self.batch_form.get_form_data()
-        company_data = self.company_form.get_company_data()
-        
-        # Usar el primer destinatario para la vista previa
-        if form_data["recipients"]:
-            recipient = form_data["recipients"][0]
-            email = recipient["email"]
-            name = recipient["name"] or "Usuario"
-        else:
-            email = "usuario@ejemplo.com"
-            name = "Usuario de Prueba"
-        
+        ctx, form_data = self._common_batch_ctx()
         query = form_data.get("query", {})
         
-        return {
-            "company": company_data,
-            "user": {
-                "name": name,
-                "email": email
-            },
-            "reset_url": query.get("reset_url", "https://miempresa.com/reset-password"),
-            "expires_in": query.get("expires_in", 24),
-            "year": 2025
-        }
+        ctx["reset_url"] = query.get("reset_url", "https://miempresa.com/reset-password")
+        ctx["expires_in"] = query.get("expires_in", 24)
+        return ctx
     
     def _get_batch_notification_template_data(self):
         """Obtiene los datos para la plantilla de notificación en lote."""
-        form_data = self.batch_form.get_form_data()
-        company_data = self.company_form.get_company_data()
-        
-        # Usar el primer destinatario para la vista previa
-        if form_data["recipients"]:
-            recipient = form_data["recipients"][0]
-            email = recipient["email"]
-            name = recipient["name"] or "Usuario"
-        else:
-            email = "usuario@ejemplo.com"
-            name = "Usuario de Prueba"
-        
+        ctx, form_data = self._common_batch_ctx()
         query = form_data.get("query", {})
         
         # Este es un caso especial donde la consulta contiene los datos de la notificación
-        notification = {
-            "title": query.get("title", "Notificación Importante"),
-            "message": query.get("message", "Este es un mensaje de notificación de prueba."),
-            "type": query.get("type", "info"),
-            "icon": query.get("icon"),
-            "action_url": query.get("action_url"),
-            "action_text": query.get("action_text"),
-            "additional_info": query.get("additional_info")
-        }
-        
-        return {
-            "company": company_data,
-            "user": {
-                "name": name,
-                "email": email
-            },
-            "notification": notification,
-            "preferences_url": query.get("preferences_url", ""),
-            "year": 2025
+        ctx["notification"] = {
+            **_NOTIFICATION_DEFAULTS,
+            **{key: query[key] for key in _NOTIFICATION_KEYS & query.keys()}
         }
+        ctx["preferences_url"] = query.get("preferences_url", "")
+        return ctx
     
     def _get_batch_alert_template_data(self):
         """Obtiene los datos para la plantilla de alerta en lote."""
-        form_data = self.batch_form.get_form_data()
-        company_data = self.company_form.get_company_data()
-        
-        # Usar el primer destinatario para la vista previa
-        if form_data["recipients"]:
-            recipient = form_data["recipients"][0]
-            email = recipient["email"]
-            name = recipient["name"] or "Usuario"
-        else:
-            email = "usuario@ejemplo.com"
-            name = "Usuario de Prueba"
+        ctx, form_data = self._common_batch_ctx()
         
-        alert = form_data.get("alert", {
+        ctx["alert"] = form_data.get("alert", {
             "title": "Alerta de Seguridad",
             "message": "Este es un mensaje de alerta de prueba.",
             "type": "info",
@@ -851,13 +1044,4 @@ class EmailTesterMainWindow(QMainWindow):
             "action_text": "Resolver Ahora",
             "contact_support": True
         })
-        
-        return {
-            "company": company_data,
-            "user": {
-                "name": name,
-                "email": email
-            },
-            "alert": alert,
-            "year": 2025
-        }
\ No newline at end of file
+        return ctx
\ No newline at end of file
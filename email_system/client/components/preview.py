@@ -1,17 +1,40 @@
 """
 Componente de vista previa de email.
 """
+import atexit
 import logging
+import os
 import tempfile
 import webbrowser
+from pathlib import Path
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, 
-    QTextBrowser, QFileDialog, QSplitter, QMessageBox
+    QTextBrowser, QFileDialog, QMessageBox
 )
-from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtCore import QObject, QRunnable, QUrl, pyqtSignal
+from PyQt5.QtGui import QDesktopServices
+
+# PyQtWebEngine es opcional: si está instalado, la vista previa se analiza y
+# dibuja en el proceso de Chromium en lugar de en el hilo de la interfaz
+try:
+    from PyQt5.QtWebEngineWidgets import QWebEnginePage, QWebEngineView
+except ImportError:
+    QWebEnginePage = QWebEngineView = None
 
 logger = logging.getLogger(__name__)
 
+
+if QWebEnginePage is not None:
+    class _ExternalLinksPage(QWebEnginePage):
+        """Página que abre los enlaces pulsados en el navegador del sistema."""
+        
+        def acceptNavigationRequest(self, url, nav_type, is_main_frame):
+            if nav_type == QWebEnginePage.NavigationTypeLinkClicked:
+                QDesktopServices.openUrl(url)
+                return False
+            return super().acceptNavigationRequest(url, nav_type, is_main_frame)
+
+
 class EmailPreviewPanel(QWidget):
     """Panel de vista previa de email con funcionalidades de guardado y apertura en navegador."""
     
@@ -21,6 +44,16 @@ class EmailPreviewPanel(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.html_content = None
+        
+        # Archivo temporal para abrir la vista previa en el navegador. Se crea
+        # en exclusiva con mkstemp para no seguir un enlace simbólico ajeno
+        fd, path = tempfile.mkstemp(prefix="email_preview_", suffix=".html")
+        os.close(fd)
+        self._preview_path = Path(path)
+        self._browser_html = None
+        self._base_url = QUrl()
+        atexit.register(self._remove_preview_file)
+        
         self._setup_ui()
     
     def _setup_ui(self):
@@ -52,8 +85,12 @@ class EmailPreviewPanel(QWidget):
         layout.addWidget(header)
         
         # Visor de HTML
-        self.html_viewer = QTextBrowser()
-        self.html_viewer.setOpenExternalLinks(True)
+        if QWebEngineView is not None:
+            self.html_viewer = QWebEngineView()
+            self.html_viewer.setPage(_ExternalLinksPage(self.html_viewer))
+        else:
+            self.html_viewer = QTextBrowser()
+            self.html_viewer.setOpenExternalLinks(True)
         layout.addWidget(self.html_viewer)
     
     def set_html_content(self, html):
@@ -67,8 +104,13 @@ class EmailPreviewPanel(QWidget):
             logger.warning("Intentando establecer contenido HTML vacío")
             return
         
+        # setHtml vuelve a analizar todo el documento; si el HTML es el que
+        # ya se muestra no hay nada que hacer
+        if html == self.html_content:
+            return
+        
         self.html_content = html
-        self.html_viewer.setHtml(html)
+        self._show_html(html)
         
         # Habilitar botones
         self.preview_in_browser_btn.setEnabled(True)
@@ -76,10 +118,29 @@ class EmailPreviewPanel(QWidget):
         
         logger.debug("Contenido HTML establecido en la vista previa")
     
+    def set_base_dir(self, directory):
+        """
+        Establece el directorio desde el que se resuelven las rutas relativas
+        del HTML (imágenes, hojas de estilo).
+        
+        Args:
+            directory: Directorio de plantillas
+        """
+        self._base_url = QUrl.fromLocalFile(os.path.join(str(directory), ''))
+        if isinstance(self.html_viewer, QTextBrowser):
+            self.html_viewer.setSearchPaths([str(directory)])
+    
+    def _show_html(self, html):
+        """Carga el HTML en el visor."""
+        if isinstance(self.html_viewer, QTextBrowser):
+            self.html_viewer.setHtml(html)
+        else:
+            self.html_viewer.setHtml(html, self._base_url)
+    
     def clear_preview(self):
         """Limpia la vista previa."""
         self.html_content = None
-        self.html_viewer.setHtml("")
+        self._show_html("")
         
         # Deshabilitar botones
         self.preview_in_browser_btn.setEnabled(False)
@@ -94,18 +155,28 @@ class EmailPreviewPanel(QWidget):
             return
             
         try:
-            # Crear archivo temporal
-            with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.html', encoding='utf-8') as f:
-                f.write(self.html_content)
-                temp_name = f.name
+            # Se reutiliza un único archivo temporal por sesión y solo se
+            # reescribe si el contenido cambió desde la última apertura
+            if self.html_content != self._browser_html:
+                self._preview_path.write_text(self.html_content, encoding='utf-8')
+                self._browser_html = self.html_content
             
             # Abrir en navegador
-            webbrowser.open('file://' + temp_name)
-            logger.info(f"Vista previa abierta en navegador: {temp_name}")
+            webbrowser.open(self._preview_path.as_uri())
+            logger.info(f"Vista previa abierta en navegador: {self._preview_path}")
         except Exception as e:
             logger.error(f"Error al abrir en navegador: {str(e)}")
             self.error_occurred.emit(f"No se pudo abrir en el navegador: {str(e)}")
     
+    def _remove_preview_file(self):
+        """Elimina el archivo temporal de la vista previa al salir."""
+        try:
+            self._preview_path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.debug(f"No se pudo eliminar {self._preview_path}: {str(e)}")
+    
     def save_html(self):
         """Guarda la vista previa actual como archivo HTML."""
         if not self.html_content:
@@ -126,44 +197,74 @@ class EmailPreviewPanel(QWidget):
                 self.error_occurred.emit(f"No se pudo guardar el archivo: {str(e)}")
 
 
-class RenderPreviewWorker:
+class RenderPreviewSignals(QObject):
     """
-    Clase para renderizar la vista previa en un hilo separado.
-    En una implementación real, esto debería ser un QThread,
-    pero aquí se deja como stub para simplificar.
+    Señales de los renderizados de vista previa.
+    
+    Se crea una sola instancia en el hilo de la interfaz y la comparten todos
+    los RenderPreviewWorker, de modo que las conexiones se hacen una vez.
+    Cada señal incluye el número de renderizado que la produjo.
     """
     
-    def __init__(self, template_env, template_name, template_data):
+    preview_ready = pyqtSignal(int, str)
+    error = pyqtSignal(int, str)
+
+
+class RenderPreviewWorker(QRunnable):
+    """Tarea del QThreadPool que renderiza la vista previa fuera del hilo de la interfaz."""
+    
+    def __init__(self, template, template_data, epoch, signals):
         """
         Inicializa el renderizador de vistas previas.
         
         Args:
-            template_env: Entorno de plantillas Jinja2
-            template_name: Nombre de la plantilla a renderizar
+            template: Plantilla Jinja2 ya resuelta a renderizar
             template_data: Datos para la plantilla
+            epoch: Número de renderizado, para descartar resultados obsoletos
+            signals: RenderPreviewSignals por las que se notifica el resultado
         """
-        self.template_env = template_env
-        self.template_name = template_name
+        super().__init__()
+        self.template = template
         self.template_data = template_data
-        
-        # Callbacks
-        self.on_preview_ready = None
-        self.on_error = None
-        
+        self.epoch = epoch
+        self.signals = signals
+    
     def run(self):
         """Ejecuta el renderizado de la vista previa."""
         try:
-            if not self.template_env:
-                if self.on_error:
-                    self.on_error("El motor de plantillas no está configurado.")
+            if not self.template:
+                self.signals.error.emit(self.epoch, "El motor de plantillas no está configurado.")
                 return
             
-            template = self.template_env.get_template(self.template_name)
-            html_content = template.render(**self.template_data)
-            
-            if self.on_preview_ready:
-                self.on_preview_ready(html_content)
+            html_content = self.template.render(**self.template_data)
+            self.signals.preview_ready.emit(self.epoch, html_content)
         except Exception as e:
             logger.error(f"Error al renderizar vista previa: {str(e)}")
-            if self.on_error:
-                self.on_error(f"Error al renderizar vista previa: {str(e)}")
\ No newline at end of file
+            self.signals.error.emit(self.epoch, f"Error al renderizar vista previa: {str(e)}")
+
+
+class TemplatePrewarmWorker(QRunnable):
+    """
+    Tarea del QThreadPool que carga y compila plantillas por adelantado.
+    
+    Deja las plantillas en la caché del propio entorno Jinja2 (y en su caché
+    de bytecode), de modo que la primera vista previa solo tenga que renderizar.
+    """
+    
+    def __init__(self, template_env, template_names):
+        """
+        Args:
+            template_env: Entorno de plantillas Jinja2
+            template_names: Nombres de las plantillas a cargar
+        """
+        super().__init__()
+        self.template_env = template_env
+        self.template_names = tuple(template_names)
+    
+    def run(self):
+        """Carga cada plantilla; las que falten o fallen se ignoran."""
+        for name in self.template_names:
+            try:
+                self.template_env.get_template(name)
+            except Exception as e:
+                logger.debug(f"No se pudo precargar la plantilla {name}: {str(e)}")
\ No newline at end of file
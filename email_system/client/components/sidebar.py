@@ -3,7 +3,7 @@ Componente de barra lateral para la aplicación.
 """
 import logging
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QLabel, QListWidget, QListWidgetItem
+    QWidget, QVBoxLayout, QLabel, QListWidget
 )
 from PyQt5.QtCore import Qt, pyqtSignal
 
@@ -12,6 +12,15 @@ logger = logging.getLogger(__name__)
 class EmailTypesSidebar(QWidget):
     """Barra lateral con los tipos de emails disponibles."""
     
+    # Tipos de email de la lista: (tipo, nombre, icono)
+    _EMAIL_TYPES = (
+        ("welcome", "Bienvenida", "👋"),
+        ("password_reset", "Reset Contraseña", "🔒"),
+        ("notification", "Notificación", "🔔"),
+        ("alert", "Alerta", "⚠️"),
+        ("batch", "Envío en Lote", "📧")
+    )
+    
     # Señal que se emite cuando cambia la selección
     email_type_changed = pyqtSignal(str)
     
@@ -19,11 +28,10 @@ class EmailTypesSidebar(QWidget):
         super().__init__(parent)
         self.setMaximumWidth(250)
         self.setMinimumWidth(200)
-        self.setStyleSheet("""
-            background-color: #2e2e36;
-            border-top-left-radius: 0px;
-            border-bottom-left-radius: 0px;
-        """)
+        
+        # Los estilos están en la hoja de estilos de la aplicación (app.qss)
+        self.setObjectName("EmailTypesSidebar")
+        self.setAttribute(Qt.WA_StyledBackground, True)
         
         self._setup_ui()
     
@@ -36,35 +44,18 @@ class EmailTypesSidebar(QWidget):
         # Título de la barra lateral
         header = QLabel("Email System")
         header.setAlignment(Qt.AlignCenter)
-        header.setStyleSheet("""
-            font-size: 18px;
-            font-weight: bold;
-            padding: 20px 15px;
-            color: white;
-            background-color: #232329;
-        """)
+        header.setObjectName("SidebarHeader")
         layout.addWidget(header)
         
         # Subtítulo
         subtitle = QLabel("TIPOS DE EMAIL")
         subtitle.setAlignment(Qt.AlignLeft)
-        subtitle.setStyleSheet("""
-            font-size: 12px;
-            font-weight: bold;
-            padding: 15px 20px 10px 20px;
-            color: #9e9e9e;
-            background-color: #232329;
-        """)
+        subtitle.setObjectName("SidebarSubtitle")
         layout.addWidget(subtitle)
         
         # Lista de tipos de email
         self.email_types_list = QListWidget()
-        self.email_types_list.setStyleSheet("""
-            border: none;
-            outline: none;
-            min-height: 800px;
-            background-color: #232329;                                            
-        """)
+        self.email_types_list.setObjectName("SidebarList")
         
         # Añadir los tipos de email
         self._add_email_types()
@@ -80,33 +71,26 @@ class EmailTypesSidebar(QWidget):
         # Footer
         footer = QLabel("© 2025 Email System")
         footer.setAlignment(Qt.AlignCenter)
-        footer.setStyleSheet("""
-            font-size: 12px;
-            padding: 15px;
-            color: #9e9e9e;
-            background-color: #232329;
-        """)
+        footer.setObjectName("SidebarFooter")
         layout.addWidget(footer)
     
     def _add_email_types(self):
         """Añade los tipos de email a la lista."""
-        email_types = [
-            ("welcome", "Bienvenida", "👋"),
-            ("password_reset", "Reset Contraseña", "🔒"),
-            ("notification", "Notificación", "🔔"),
-            ("alert", "Alerta", "⚠️"),
-            ("batch", "Envío en Lote", "📧")
-        ]
+        email_types_list = self.email_types_list
         
-        for email_type, display_name, icon in email_types:
-            item = QListWidgetItem()
-            item.setData(Qt.UserRole, email_type)
-            item.setText(f"{icon}  {display_name}")
-            self.email_types_list.addItem(item)
+        # Insertar todos los textos de una vez y después asociar a cada fila
+        # su tipo, sin repintar la lista hasta terminar
+        email_types_list.setUpdatesEnabled(False)
+        email_types_list.addItems([
+            f"{icon}  {display_name}" for _, display_name, icon in self._EMAIL_TYPES
+        ])
+        for row, (email_type, _, _) in enumerate(self._EMAIL_TYPES):
+            email_types_list.item(row).setData(Qt.UserRole, email_type)
+        email_types_list.setUpdatesEnabled(True)
         
         # Seleccionar el primer elemento por defecto
-        if self.email_types_list.count() > 0:
-            self.email_types_list.setCurrentRow(0)
+        if email_types_list.count() > 0:
+            email_types_list.setCurrentRow(0)
     
     def _on_item_changed(self, current, previous):
         """Maneja el cambio de selección en la lista."""
@@ -5,12 +5,16 @@ Organiza los componentes y configura la aplicación.
 import sys
 import argparse
 import logging
+from pathlib import Path
 from PyQt5.QtWidgets import QApplication
-from PyQt5.QtGui import QIcon, QPalette, QColor
+from PyQt5.QtGui import QPalette, QColor
 
 from config import ClientConfig
 from components.main_window import EmailTesterMainWindow
 
+# Hoja de estilos global del cliente
+STYLESHEET_PATH = Path(__file__).parent / "styles" / "app.qss"
+
 
 def setup_logging(debug=False):
     """
@@ -105,111 +109,12 @@ def setup_app_style(app):
     
     app.setPalette(palette)
     
-    # Cargar hoja de estilos CSS
-    app.setStyleSheet("""
-        /* Estilos generales */
-        QMainWindow, QDialog {
-            background-color: #fafafc;
-        }
-        
-        /* Barra lateral */
-        QListWidget {
-            background-color: #2e2e36;
-            border: none;
-            border-radius: 0px;
-            font-size: 14px;
-            padding: 8px 0px;
-        }
-        
-        QListWidget::item {
-            color: #e0e0e0;
-            padding: 12px 16px;
-            margin: 4px 8px;
-            border-radius: 6px;
-        }
-        
-        QListWidget::item:selected {
-            background-color: #9c27b0;
-            color: white;
-        }
-        
-        QListWidget::item:hover:!selected {
-            background-color: #3a3a44;
-        }
-        
-        /* Encabezados y etiquetas */
-        QLabel {
-            color: #212121;
-            font-size: 13px;
-        }
-        
-        QGroupBox {
-            font-size: 14px;
-            font-weight: bold;
-            border: 1px solid #e0e0e0;
-            border-radius: 8px;
-            margin-top: 16px;
-            padding-top: 16px;
-            background-color: white;
-        }
-        
-        QGroupBox::title {
-            subcontrol-origin: margin;
-            subcontrol-position: top left;
-            padding: 0 10px;
-            color: #9c27b0;
-            background-color: transparent;
-        }
-        
-        /* Campos de entrada */
-        QLineEdit, QTextEdit, QComboBox, QSpinBox {
-            border: 1px solid #e0e0e0;
-            border-radius: 6px;
-            padding: 8px;
-            background-color: white;
-            selection-background-color: #9c27b0;
-            selection-color: white;
-            min-height: 20px;
-        }
-        
-        QLineEdit:focus, QTextEdit:focus, QComboBox:focus, QSpinBox:focus {
-            border: 2px solid #9c27b0;
-            padding: 7px;
-        }
-        
-        /* Botones */
-        QPushButton {
-            background-color: #f5f5f5;
-            color: #212121;
-            border: none;
-            border-radius: 6px;
-            padding: 10px 16px;
-            font-weight: bold;
-            min-width: 80px;
-        }
-        
-        QPushButton:hover {
-            background-color: #e0e0e0;
-        }
-        
-        QPushButton:pressed {
-            background-color: #d0d0d0;
-        }
-        
-        /* Scrollbars */
-        QScrollBar:vertical {
-            border: none;
-            background: #f5f5f5;
-            width: 10px;
-            margin: 0px;
-        }
-        
-        QScrollBar::handle:vertical {
-            background: #9c27b0;
-            min-height: 20px;
-            border-radius: 5px;
-        }
-    """)
+    # Cargar la hoja de estilos de la aplicación, una sola vez. Los widgets
+    # de la barra lateral toman sus estilos de ella mediante su objectName
+    try:
+        app.setStyleSheet(STYLESHEET_PATH.read_text(encoding="utf-8"))
+    except OSError as e:
+        logging.getLogger(__name__).warning(f"No se pudo cargar la hoja de estilos: {str(e)}")
 
 
 def main():
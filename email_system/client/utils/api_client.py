@@ -4,7 +4,9 @@ Cliente API para comunicarse con el backend.
 import logging
 import json
 import requests
-from typing import Dict, Any, List, Optional, Union
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Any, List, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -28,18 +30,34 @@ class EmailAPIClient:
             api_key: API key para autenticación
         """
         self.base_url = base_url.rstrip('/')
-        self.api_key = api_key
-    
-    def _get_headers(self) -> Dict[str, str]:
-        """Retorna los headers para las peticiones HTTP."""
-        headers = {
-            "Content-Type": "application/json"
-        }
         
-        if self.api_key:
-            headers["X-API-Key"] = self.api_key
+        # Sesión persistente: reutiliza las conexiones entre peticiones.
+        # Retry solo repite métodos idempotentes, nunca un POST de envío
+        self._session = requests.Session()
+        self._session.headers["Content-Type"] = "application/json"
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=4,
+            max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+        )
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
         
-        return headers
+        self.api_key = api_key
+    
+    @property
+    def api_key(self) -> Optional[str]:
+        """API key usada para autenticar las peticiones."""
+        return self._api_key
+    
+    @api_key.setter
+    def api_key(self, api_key: Optional[str]):
+        # La cabecera se actualiza una vez aquí y no en cada petición
+        self._api_key = api_key
+        if api_key:
+            self._session.headers["X-API-Key"] = api_key
+        else:
+            self._session.headers.pop("X-API-Key", None)
     
     def _handle_response(self, response) -> Dict[str, Any]:
         """
@@ -86,7 +104,7 @@ class EmailAPIClient:
             url = f"{self.base_url.replace('/api', '')}/health"
             logger.debug(f"Verificando estado de la API: {url}")
             
-            response = requests.get(url)
+            response = self._session.get(url)
             return self._handle_response(response)
         except requests.exceptions.RequestException as e:
             logger.error(f"Error de conexión al verificar estado: {str(e)}")
@@ -128,11 +146,7 @@ class EmailAPIClient:
             logger.debug(f"Enviando petición POST a {url}")
             logger.debug(f"Datos: {json.dumps(data, indent=2)}")
             
-            response = requests.post(
-                url,
-                json=data,
-                headers=self._get_headers()
-            )
+            response = self._session.post(url, json=data)
             
             return self._handle_response(response)
         except requests.exceptions.RequestException as e:
@@ -178,11 +192,7 @@ class EmailAPIClient:
             logger.debug(f"Enviando petición POST a {url}")
             logger.debug(f"Datos: {json.dumps(data, indent=2)}")
             
-            response = requests.post(
-                url,
-                json=data,
-                headers=self._get_headers()
-            )
+            response = self._session.post(url, json=data)
             
             return self._handle_response(response)
         except requests.exceptions.RequestException as e:
@@ -228,11 +238,7 @@ class EmailAPIClient:
             logger.debug(f"Enviando petición POST a {url}")
             logger.debug(f"Datos: {json.dumps(data, indent=2)}")
             
-            response = requests.post(
-                url,
-                json=data,
-                headers=self._get_headers()
-            )
+            response = self._session.post(url, json=data)
             
             return self._handle_response(response)
         except requests.exceptions.RequestException as e:
@@ -271,11 +277,7 @@ class EmailAPIClient:
             logger.debug(f"Enviando petición POST a {url}")
             logger.debug(f"Datos: {json.dumps(data, indent=2)}")
             
-            response = requests.post(
-                url,
-                json=data,
-                headers=self._get_headers()
-            )
+            response = self._session.post(url, json=data)
             
             return self._handle_response(response)
         except requests.exceptions.RequestException as e:
@@ -324,11 +326,7 @@ class EmailAPIClient:
             logger.debug(f"Enviando petición POST a {url}")
             logger.debug(f"Datos: {json.dumps(data, indent=2)}")
             
-            response = requests.post(
-                url,
-                json=data,
-                headers=self._get_headers()
-            )
+            response = self._session.post(url, json=data)
             
             return self._handle_response(response)
         except requests.exceptions.RequestException as e:
@@ -0,0 +1,45 @@
+"""
+Ejecución de llamadas a la API fuera del hilo de la interfaz.
+"""
+import logging
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+
+class ApiCallSignals(QObject):
+    """
+    Señales con el resultado de una llamada a la API.
+    
+    Se crean en el hilo de la interfaz, así que sus slots se ejecutan en él
+    aunque la llamada termine en otro hilo.
+    """
+    
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(object)
+
+
+class ApiCallWorker(QRunnable):
+    """Tarea del QThreadPool que ejecuta una llamada bloqueante a la API."""
+    
+    def __init__(self, call, signals):
+        """
+        Inicializa la tarea.
+        
+        Args:
+            call: Función sin argumentos que realiza la petición
+            signals: ApiCallSignals por las que se notifica el resultado
+        """
+        super().__init__()
+        self.call = call
+        self.signals = signals
+    
+    def run(self):
+        """Ejecuta la llamada y emite su resultado o la excepción producida."""
+        try:
+            result = self.call()
+        except Exception as e:
+            logger.debug(f"Llamada a la API fallida: {str(e)}")
+            self.signals.failed.emit(e)
+            return
+        self.signals.finished.emit(result)
\ No newline at end of file
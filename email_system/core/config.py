@@ -4,7 +4,7 @@ Carga variables de entorno y proporciona valores predeterminados.
 """
 import os
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 from pydantic import Field, validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -16,6 +16,24 @@ class EmailSystemSettings(BaseSettings):
     API_KEY: str = Field(default="")
     RESEND_API_KEY: str = Field(default="")
     
+    # API HTTP de Resend (usada para los envíos asíncronos en lote)
+    RESEND_API_URL: str = Field(default="https://api.resend.com/emails")
+    RESEND_TIMEOUT: float = Field(default=10.0)
+    
+    # Concurrencia de los envíos en lote y pool de conexiones HTTP
+    EMAIL_MAX_CONCURRENCY: int = Field(default=16)
+    HTTP_MAX_CONNECTIONS: int = Field(default=64)
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = Field(default=32)
+    
+    # Orígenes autorizados para CORS (JSON en la variable de entorno, por ejemplo
+    # CORS_ORIGINS='["https://panel.example.com"]'). El cliente de escritorio no
+    # necesita CORS, por lo que la lista está vacía por defecto
+    CORS_ORIGINS: List[str] = Field(default_factory=list)
+    
+    # Tamaño máximo, en bytes, de un cuerpo de petición gzip una vez
+    # descomprimido; por encima se responde 413
+    MAX_DECOMPRESSED_BODY_SIZE: int = Field(default=10 * 1024 * 1024)
+    
     # Valores predeterminados para el servicio de email
     DEFAULT_FROM_EMAIL: str = Field(default="no-reply@example.com")
     DEFAULT_FROM_NAME: str = Field(default="Email System")
@@ -28,6 +46,9 @@ class EmailSystemSettings(BaseSettings):
     DEBUG: bool = Field(default=False)
     TESTING: bool = Field(default=False)
     
+    # Número de procesos worker de uvicorn (ignorado con DEBUG, que usa reload)
+    WORKERS: int = Field(default=1)
+    
     # Configuración para cargar variables desde .env
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -3,12 +3,15 @@ Modelos de datos para la aplicación de sistema de emails.
 Usa Pydantic para validación y conversión de tipos.
 """
 from __future__ import annotations
-from pydantic import BaseModel, EmailStr, validator, HttpUrl, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, field_validator, HttpUrl, Field
 from typing import List, Optional, Dict, Any, Union
 
 
 class EmailAddress(BaseModel):
     """Modelo para una dirección de correo electrónico con nombre opcional."""
+    # Inmutable: las direcciones se comparten entre destinatarios y plantillas
+    model_config = ConfigDict(frozen=True)
+    
     email: EmailStr
     name: Optional[str] = None
     
@@ -26,14 +29,16 @@ class Company(BaseModel):
     social_media: Dict[str, str] = Field(default_factory=dict)
     logo_url: Optional[Union[HttpUrl, str]] = None
     
-    @validator('support_email', pre=True)
+    @field_validator('support_email', mode='before')
+    @classmethod
     def parse_support_email(cls, v):
         """Convierte una cadena en objeto EmailAddress si es necesario."""
         if isinstance(v, str):
             return EmailAddress(email=v)
         return v
     
-    @validator('logo_url', pre=True)
+    @field_validator('logo_url', mode='before')
+    @classmethod
     def parse_logo_url(cls, v):
         """Permite usar cadenas para logo_url."""
         if v == "" or v is None:
@@ -51,7 +56,8 @@ class Notification(BaseModel):
     action_text: Optional[str] = None
     additional_info: Optional[str] = None
     
-    @validator('type')
+    @field_validator('type')
+    @classmethod
     def validate_type(cls, v):
         """Valida que el tipo sea uno de los permitidos."""
         allowed_types = ["success", "warning", "error", "info"]
@@ -70,7 +76,8 @@ class Alert(BaseModel):
     action_text: Optional[str] = None
     contact_support: bool = True
     
-    @validator('type')
+    @field_validator('type')
+    @classmethod
     def validate_type(cls, v):
         """Valida que el tipo sea uno de los permitidos."""
         allowed_types = ["info", "warning", "error"]
@@ -1,11 +1,14 @@
 """
 Servicio de email mejorado con mejor manejo de errores, logging y configuración.
 """
+import asyncio
 import logging
 from pathlib import Path
-from typing import List, Optional, Union, Dict, Any, Tuple
+from typing import AsyncIterator, List, Optional, Set, Union, Dict, Any, Tuple
+import httpx
 import resend
 from jinja2 import Environment, FileSystemLoader, select_autoescape, TemplateNotFound
+from markupsafe import escape
 from premailer import Premailer
 
 from email_system.core.exceptions import EmailServiceError, TemplateNotFoundError
@@ -16,6 +19,77 @@ from email_system.core.config import settings
 # Configurar logger
 logger = logging.getLogger(__name__)
 
+# Marcadores de los datos de cada destinatario en los envíos en lote
+RECIPIENT_NAME_TOKEN = "__EMAIL_SYSTEM_RECIPIENT_NAME__"
+RECIPIENT_EMAIL_TOKEN = "__EMAIL_SYSTEM_RECIPIENT_EMAIL__"
+
+
+def create_template_environment(templates_dir: Union[str, Path]) -> Environment:
+    """
+    Crea el entorno Jinja2 usado para renderizar las plantillas de email.
+    
+    Args:
+        templates_dir: Directorio de las plantillas
+        
+    Returns:
+        Environment: Entorno de plantillas configurado
+    """
+    return Environment(
+        loader=FileSystemLoader(templates_dir),
+        autoescape=select_autoescape(['html', 'xml']),
+        trim_blocks=True,
+        lstrip_blocks=True
+    )
+
+
+def render_with_inline_styles(
+    template_env: Environment,
+    template_name: str,
+    context: Dict[str, Any]
+) -> str:
+    """
+    Renderiza una plantilla y convierte sus estilos a inline.
+    
+    Args:
+        template_env: Entorno de plantillas
+        template_name: Nombre del archivo de plantilla
+        context: Datos para la plantilla
+        
+    Returns:
+        str: HTML con estilos inlineados
+        
+    Raises:
+        TemplateNotFoundError: Si no se encuentra la plantilla
+        EmailServiceError: Si hay un error al renderizar o procesar estilos
+    """
+    try:
+        # Obtener la plantilla
+        template = template_env.get_template(template_name)
+    except TemplateNotFound:
+        raise TemplateNotFoundError(f"Plantilla no encontrada: {template_name}")
+    except Exception as e:
+        raise EmailServiceError(f"Error al cargar la plantilla {template_name}: {str(e)}")
+        
+    try:
+        # Renderizar la plantilla
+        html = template.render(**context)
+    except Exception as e:
+        raise EmailServiceError(f"Error al renderizar la plantilla {template_name}: {str(e)}")
+    
+    # Usar premailer para convertir estilos a inline
+    try:
+        premailer = Premailer(
+            html,
+            keep_style_tags=True,
+            remove_classes=False,
+            strip_important=False
+        )
+        return premailer.transform()
+    except Exception as e:
+        logger.warning("Error al convertir estilos a inline: %s", e)
+        # Fallback al HTML original si hay error
+        return html
+
 
 class EmailService:
     """Servicio para envío de emails utilizando Resend con mejoras de manejo de errores."""
@@ -44,6 +118,11 @@ class EmailService:
         # Configurar Resend
         resend.api_key = self.api_key
         
+        # Cliente HTTP asíncrono y semáforo para envíos en lote; se crean bajo
+        # demanda dentro del event loop que los va a usar
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._send_semaphore: Optional[asyncio.Semaphore] = None
+        
         # Dirección remitente predeterminada
         if default_from is None:
             config_from = settings.get_default_from_address()
@@ -67,13 +146,8 @@ class EmailService:
         
         # Configurar el motor de plantillas Jinja2
         try:
-            self.template_env = Environment(
-                loader=FileSystemLoader(self.templates_dir),
-                autoescape=select_autoescape(['html', 'xml']),
-                trim_blocks=True,
-                lstrip_blocks=True
-            )
-            logger.info(f"Motor de plantillas configurado con el directorio: {self.templates_dir}")
+            self.template_env = create_template_environment(self.templates_dir)
+            logger.info("Motor de plantillas configurado con el directorio: %s", self.templates_dir)
         except Exception as e:
             raise EmailServiceError(f"Error al configurar el motor de plantillas: {str(e)}")
     
@@ -92,33 +166,7 @@ class EmailService:
             TemplateNotFoundError: Si no se encuentra la plantilla
             EmailServiceError: Si hay un error al renderizar o procesar estilos
         """
-        try:
-            # Obtener la plantilla
-            template = self.template_env.get_template(template_name)
-        except TemplateNotFound:
-            raise TemplateNotFoundError(f"Plantilla no encontrada: {template_name}")
-        except Exception as e:
-            raise EmailServiceError(f"Error al cargar la plantilla {template_name}: {str(e)}")
-            
-        try:
-            # Renderizar la plantilla
-            html = template.render(**context)
-        except Exception as e:
-            raise EmailServiceError(f"Error al renderizar la plantilla {template_name}: {str(e)}")
-        
-        # Usar premailer para convertir estilos a inline
-        try:
-            premailer = Premailer(
-                html,
-                keep_style_tags=True,
-                remove_classes=False,
-                strip_important=False
-            )
-            return premailer.transform()
-        except Exception as e:
-            logger.warning(f"Error al convertir estilos a inline: {str(e)}")
-            # Fallback al HTML original si hay error
-            return html
+        return render_with_inline_styles(self.template_env, template_name, context)
     
     def _prepare_email_params(
         self,
@@ -157,6 +205,97 @@ class EmailService:
             
         return params
     
+    def render_template_once(self, email: BaseEmail) -> Tuple[str, str]:
+        """
+        Renderiza la plantilla de un envío en lote una sola vez.
+        
+        Los datos propios de cada destinatario (nombre y email) se sustituyen
+        por marcadores que luego reemplaza _personalize_html, evitando un
+        render de Jinja y una pasada de premailer por destinatario.
+        
+        Args:
+            email: Instancia de BaseEmail con los datos del email
+            
+        Returns:
+            Tuple[str, str]: HTML con marcadores y nombre a usar cuando el
+            destinatario no tiene nombre
+        """
+        template_data, default_name = self._batch_template_data(email)
+        html_content = self._render_with_inline_styles(
+            email.template_name,
+            template_data
+        )
+        return html_content, default_name
+    
+    def _batch_template_data(self, email: BaseEmail) -> Tuple[Dict[str, Any], str]:
+        """
+        Obtiene los datos de plantilla de un lote con marcadores en lugar del destinatario.
+        
+        Args:
+            email: Instancia de BaseEmail con los datos del email
+            
+        Returns:
+            Tuple[dict, str]: Datos para la plantilla y nombre predeterminado
+        """
+        template_data = email.get_template_data()
+        default_name = "Usuario"
+        
+        if 'user' in template_data:
+            user_data = dict(template_data['user'])
+            default_name = user_data.get('name', default_name)
+            user_data['name'] = RECIPIENT_NAME_TOKEN
+            user_data['email'] = RECIPIENT_EMAIL_TOKEN
+            template_data['user'] = user_data
+        
+        return template_data, default_name
+    
+    def _personalize_html(self, html_content: str, recipient: EmailAddress, default_name: str) -> str:
+        """
+        Reemplaza los marcadores de render_template_once con los datos del destinatario.
+        
+        Los valores se escapan igual que lo haría el autoescape de Jinja.
+        
+        Args:
+            html_content: HTML con marcadores
+            recipient: Destinatario del email
+            default_name: Nombre a usar si el destinatario no tiene nombre
+            
+        Returns:
+            str: HTML personalizado
+        """
+        name = escape(recipient.name or default_name)
+        return html_content.replace(RECIPIENT_NAME_TOKEN, name).replace(
+            RECIPIENT_EMAIL_TOKEN, escape(recipient.email)
+        )
+    
+    def _prepare_recipient_params(
+        self,
+        html_content: str,
+        default_name: str,
+        recipient: EmailAddress,
+        subject: str,
+        from_email: EmailAddress
+    ) -> Dict[str, Any]:
+        """
+        Prepara el email personalizado para un destinatario del lote.
+        
+        Args:
+            html_content: HTML con marcadores generado por render_template_once
+            default_name: Nombre a usar si el destinatario no tiene nombre
+            recipient: Destinatario, ya validado
+            subject: Asunto del email
+            from_email: Remitente
+            
+        Returns:
+            dict: Parámetros para enviar el email
+        """
+        return self._prepare_email_params(
+            from_email=from_email,
+            to=[recipient],
+            subject=subject,
+            html_content=self._personalize_html(html_content, recipient, default_name)
+        )
+    
     def send(
         self,
         email: BaseEmail,
@@ -223,10 +362,10 @@ class EmailService:
                     return params
                 
                 # Enviar el email
-                logger.info(f"Enviando email a {len(to)} destinatario(s)")
+                logger.info("Enviando email a %s destinatario(s)", len(to))
                 return resend.Emails.send(params)
             except Exception as e:
-                logger.error(f"Error al enviar email: {str(e)}")
+                logger.error("Error al enviar email: %s", e)
                 raise EmailServiceError(f"Error al enviar email: {str(e)}")
             
         # Si se requiere personalización, enviar emails separados a cada destinatario
@@ -262,38 +401,139 @@ class EmailService:
                 if self.testing:
                     results.append(params)
                 else:
-                    logger.info(f"Enviando email personalizado a {recipient.email}")
+                    logger.info("Enviando email personalizado a %s", recipient.email)
                     result = resend.Emails.send(params)
                     results.append(result)
             except Exception as e:
-                logger.error(f"Error al enviar email personalizado a {recipient.email}: {str(e)}")
+                logger.error("Error al enviar email personalizado a %s: %s", recipient.email, e)
                 # Registrar el error pero continuar con los demás destinatarios
                 results.append({"error": str(e), "email": recipient.email})
                 
         return results
     
-    def send_batch(
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """
+        Retorna el cliente HTTP asíncrono compartido, creándolo si es necesario.
+        
+        Returns:
+            httpx.AsyncClient: Cliente autenticado contra la API de Resend
+        """
+        if self._http_client is None or self._http_client.is_closed:
+            # Conexiones keep-alive reutilizadas entre envíos para amortizar
+            # los handshakes TLS a lo largo del lote
+            self._http_client = httpx.AsyncClient(
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                timeout=settings.RESEND_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=settings.HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS
+                )
+            )
+        return self._http_client
+    
+    def _get_send_semaphore(self) -> asyncio.Semaphore:
+        """
+        Retorna el semáforo que limita los envíos simultáneos a Resend.
+        
+        Returns:
+            asyncio.Semaphore: Semáforo con EMAIL_MAX_CONCURRENCY permisos
+        """
+        if self._send_semaphore is None:
+            self._send_semaphore = asyncio.Semaphore(settings.EMAIL_MAX_CONCURRENCY)
+        return self._send_semaphore
+    
+    async def _post_email(
+        self,
+        client: httpx.AsyncClient,
+        recipient: EmailAddress,
+        params: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Envía un email a través de la API HTTP de Resend.
+        
+        Args:
+            client: Cliente HTTP asíncrono
+            recipient: Destinatario del email
+            params: Parámetros del email
+            
+        Returns:
+            dict: Respuesta de Resend o diccionario con el error
+        """
+        try:
+            async with self._get_send_semaphore():
+                logger.info("Enviando email en lote a %s", recipient.email)
+                response = await client.post(settings.RESEND_API_URL, json=params)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            logger.error("Error enviando a %s: %s", recipient.email, e.response.text)
+            return {"error": e.response.text, "email": recipient.email}
+        except Exception as e:
+            logger.error("Error enviando a %s: %s", recipient.email, e)
+            return {"error": str(e), "email": recipient.email}
+    
+    async def send_batch_iter(
         self,
         email: BaseEmail,
-        recipients: List[Dict[str, Any]],
+        recipients: List[EmailAddress],
         subject: str,
         from_email: Optional[EmailAddress] = None
-    ) -> List[Dict[str, Any]]:
+    ) -> AsyncIterator[Dict[str, Any]]:
         """
-        Envía emails personalizados a múltiples destinatarios en un lote.
+        Envía emails personalizados a múltiples destinatarios de forma concurrente.
+        
+        La plantilla se renderiza una sola vez y los envíos a Resend se realizan
+        en paralelo con un cliente HTTP asíncrono, sin bloquear el event loop.
+        Como máximo EMAIL_MAX_CONCURRENCY peticiones están en
+        curso a la vez, y cada resultado se entrega en cuanto está disponible,
+        por lo que la memoria usada no crece con el tamaño del lote.
         
         Args:
             email: Instancia de BaseEmail con los datos del email
-            recipients: Lista de diccionarios con datos de destinatarios
+            recipients: Destinatarios, ya validados
             subject: Asunto del email
             from_email: Remitente (opcional, usa default_from si no se especifica)
             
-        Returns:
-            List[dict]: Lista de resultados del envío
+        Yields:
+            dict: Resultado del envío de cada destinatario, en orden de finalización
             
         Raises:
             EmailServiceError: Si hay un error en la configuración
         """
+        successes = 0
+        errors = 0
+        
+        async for result in self._iter_batch_results(
+            email, recipients, subject, from_email
+        ):
+            if "error" in result:
+                errors += 1
+            else:
+                successes += 1
+            yield result
+        
+        # Registrar estadísticas del envío en lote
+        logger.info("Envío en lote completado: %s exitosos, %s errores", successes, errors)
+    
+    async def _iter_batch_results(
+        self,
+        email: BaseEmail,
+        recipients: List[EmailAddress],
+        subject: str,
+        from_email: Optional[EmailAddress]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Prepara y envía los emails del lote con una ventana acotada de envíos en curso.
+        
+        Args:
+            email: Instancia de BaseEmail con los datos del email
+            recipients: Destinatarios, ya validados
+            subject: Asunto del email
+            from_email: Remitente (opcional, usa default_from si no se especifica)
+            
+        Yields:
+            dict: Resultado del envío de cada destinatario
+        """
         try:
             # Validar los datos del email
             email.validate()
@@ -308,73 +548,54 @@ class EmailService:
         if not recipients:
             raise EmailServiceError("No se proporcionaron destinatarios")
         
-        # Enviar emails personalizados a cada destinatario
-        results = []
-        errors = 0
-        successes = 0
+        # Renderizar la plantilla una sola vez para todo el lote
+        html_content, default_name = self.render_template_once(email)
         
-        for recipient_data in recipients:
-            try:
-                # Validar que el destinatario tenga email
-                if 'email' not in recipient_data:
-                    logger.warning("Saltando destinatario sin email")
+        client = None if self.testing else self._get_http_client()
+        in_flight: Set[asyncio.Future] = set()
+        
+        try:
+            for recipient in recipients:
+                try:
+                    params = self._prepare_recipient_params(
+                        html_content, default_name, recipient, subject, from_email
+                    )
+                except Exception as e:
+                    logger.error("Error al procesar destinatario: %s", e)
+                    yield {"error": str(e), "email": recipient.email}
                     continue
-                    
-                # Crear objeto EmailAddress para este destinatario
-                recipient = EmailAddress(
-                    email=recipient_data['email'],
-                    name=recipient_data.get('name', '')
-                )
-                
-                # Obtener los datos base de la plantilla
-                template_data = email.get_template_data()
                 
-                # Crear una copia de los datos de usuario para no modificar el original
-                if 'user' in template_data:
-                    # Crear una copia del usuario
-                    user_data = dict(template_data['user'])
-                    # Actualizar con los datos de este destinatario
-                    user_data['name'] = recipient.name or user_data.get('name', 'Usuario')
-                    user_data['email'] = recipient.email
-                    # Reemplazar en los datos de la plantilla
-                    template_data['user'] = user_data
+                # En modo de pruebas, solo retornar los parámetros
+                if self.testing:
+                    yield params
+                    continue
                 
-                # Renderizar con estilos inline
-                html_content = self._render_with_inline_styles(
-                    email.template_name, 
-                    template_data
-                )
+                # Con la ventana llena, esperar a que termine algún envío
+                if len(in_flight) >= settings.EMAIL_MAX_CONCURRENCY:
+                    done, in_flight = await asyncio.wait(
+                        in_flight, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        yield task.result()
                 
-                # Preparar los parámetros para esta persona
-                params = self._prepare_email_params(
-                    from_email=from_email,
-                    to=[recipient],
-                    subject=subject,
-                    html_content=html_content
+                in_flight.add(asyncio.ensure_future(
+                    self._post_email(client, recipient, params)
+                ))
+            
+            # Entregar los envíos que siguen en curso
+            while in_flight:
+                done, in_flight = await asyncio.wait(
+                    in_flight, return_when=asyncio.FIRST_COMPLETED
                 )
-                
-                # En modo de pruebas, solo retornar los parámetros
-                if self.testing:
-                    results.append(params)
-                    successes += 1
-                else:
-                    try:
-                        # Enviar el email
-                        logger.info(f"Enviando email en lote a {recipient.email}")
-                        result = resend.Emails.send(params)
-                        results.append(result)
-                        successes += 1
-                    except Exception as e:
-                        # Registrar el error pero continuar con los demás destinatarios
-                        logger.error(f"Error enviando a {recipient.email}: {str(e)}")
-                        results.append({"error": str(e), "email": recipient.email})
-                        errors += 1
-            except Exception as e:
-                logger.error(f"Error al procesar destinatario: {str(e)}")
-                results.append({"error": str(e)})
-                errors += 1
-        
-        # Registrar estadísticas del envío en lote
-        logger.info(f"Envío en lote completado: {successes} exitosos, {errors} errores")
-        
-        return results
\ No newline at end of file
+                for task in done:
+                    yield task.result()
+        finally:
+            # Si el consumidor abandona la iteración, no dejar envíos huérfanos
+            for task in in_flight:
+                task.cancel()
+    
+    async def aclose(self) -> None:
+        """Cierra el cliente HTTP asíncrono si fue creado."""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
\ No newline at end of file
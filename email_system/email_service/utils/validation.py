@@ -44,7 +44,7 @@ def validate_emails(emails: List[str]) -> Tuple[List[str], List[str]]:
         if validate_email(email):
             valid_emails.append(email)
         else:
-            logger.warning(f"Email inválido: {email}")
+            logger.warning("Email inválido: %s", email)
             invalid_emails.append(email)
     
     return valid_emails, invalid_emails
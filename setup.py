@@ -18,6 +18,10 @@ install_requires = [
     "jinja2>=3.1.2",
     "premailer>=3.10.0",
     "resend>=0.6.0",
+    "httpx>=0.25.0",
+    "orjson>=3.9.0",
+    "uvloop>=0.17.0; sys_platform != 'win32'",
+    "httptools>=0.6.0",
     
     # Cliente
     "PyQt5>=5.15.9",
@@ -69,6 +73,6 @@ setup(
     },
     include_package_data=True,
     package_data={
-        "email_system": ["email_service/templates/*.html"],
+        "email_system": ["email_service/templates/*.html", "client/styles/*.qss"],
     },
 )
\ No newline at end of file